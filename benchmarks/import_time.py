@@ -0,0 +1,88 @@
+"""Cold-start import time of the SDK entry points.
+
+Every sample runs in a fresh interpreter, so nothing is cached in sys.modules.
+Also reports which heavy third-party packages each import pulls in:
+
+    python benchmarks/import_time.py --output imports.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = (
+    "import smile_id_core",
+    "from smile_id_core import Signature",
+    "from smile_id_core import IdApi",
+    "from smile_id_core import Utilities",
+    "from smile_id_core import WebApi",
+    "from smile_id_core import AsyncWebApi",
+)
+HEAVY_MODULES = ("requests", "Crypto", "aiohttp", "zipfile", "concurrent.futures")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def sample(statement):
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+    )
+    return json.loads(output)
+
+
+def measure(statement, repeat):
+    samples = [sample(statement) for _ in range(repeat)]
+    timings = sorted(s["seconds"] for s in samples)
+    result = {
+        "name": statement,
+        "repeat": repeat,
+        "min_s": timings[0],
+        "median_s": statistics.median(timings),
+        "max_s": timings[-1],
+        "loaded": samples[-1]["loaded"],
+    }
+    print(
+        "{:<40} median={:.4f}s loaded={}".format(
+            statement, result["median_s"], ",".join(result["loaded"]) or "-"
+        ),
+        file=sys.stderr,
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "results": [measure(statement, args.repeat) for statement in STATEMENTS],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Offline benchmarks for the SDK hot paths.
+
+Runs against a local stub server, so no Smile Identity credentials or network
+access are needed. Results are written as JSON so runs of different SDK versions
+can be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Crypto.PublicKey import RSA  # noqa: E402
+
+from smile_id_core import IdApi, Signature, Utilities, WebApi  # noqa: E402
+from smile_id_core.image_upload import (  # noqa: E402
+    generate_zip_file,
+    prepare_info_json,
+)
+from smile_id_core.ServicesCache import ServicesIndex  # noqa: E402
+from stub_server import SERVICES, StubServer  # noqa: E402
+
+PARTNER_ID = "001"
+IMAGE_COUNTS = (1, 3, 8)
+IMAGE_SIZES = (100 * 1024, 1024 * 1024)
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+def sdk_version():
+    try:
+        from importlib.metadata import version
+
+        return version("smile_id_core")
+    except Exception:
+        return "unknown"
+
+
+def measure(name, fn, repeat, warmup=1, **params):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "min_s": timings[0],
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.mean(timings),
+        "p95_s": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "ops_per_s": repeat / sum(timings),
+    }
+    print(
+        "{:<40} {:<40} median={:.6f}s".format(
+            name, json.dumps(params, sort_keys=True), result["median_s"]
+        ),
+        file=sys.stderr,
+    )
+    return result
+
+
+def partner_params(job_type=1):
+    return {"user_id": str(uuid4()), "job_id": str(uuid4()), "job_type": job_type}
+
+
+def id_info_params():
+    return {
+        "first_name": "FirstName",
+        "middle_name": "MiddleName",
+        "last_name": "LastName",
+        "country": "NG",
+        "id_type": "PASSPORT",
+        "id_number": "A00000000",
+        "dob": "1989-09-20",
+        "phone_number": "",
+        "entered": True,
+    }
+
+
+def make_images(directory, count, size):
+    images = []
+    for i in range(count):
+        path = os.path.join(directory, "image_{}_{}.jpg".format(size, i))
+        with open(path, "wb") as f:
+            f.write(JPEG_HEADER + os.urandom(size - len(JPEG_HEADER)))
+        images.append({"image_type_id": 0 if i == 0 else 1, "image": path})
+    return images
+
+
+def run(repeat, quick):
+    api_key = RSA.generate(2048).publickey().export_key()
+    results = []
+
+    signature = Signature(PARTNER_ID, api_key)
+    results.append(
+        measure("signature.generate_sec_key", signature.generate_sec_key, repeat * 10)
+    )
+    results.append(
+        measure(
+            "signature.init_and_generate_sec_key",
+            lambda: Signature(PARTNER_ID, api_key).generate_sec_key(),
+            repeat * 10,
+        )
+    )
+
+    params = partner_params()
+    results.append(
+        measure(
+            "utilities.validate_partner_params",
+            lambda: Utilities.validate_partner_params(params),
+            repeat * 100,
+        )
+    )
+    id_info = id_info_params()
+    results.append(
+        measure(
+            "utilities.validate_id_params.local",
+            lambda: Utilities.validate_id_params(0, id_info, params, False),
+            repeat * 100,
+        )
+    )
+    index = ServicesIndex(SERVICES)
+    results.append(
+        measure(
+            "utilities.validate_id_params.index",
+            lambda: index.validate(id_info, params),
+            repeat * 100,
+        )
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = IMAGE_COUNTS[:1] if quick else IMAGE_COUNTS
+        sizes = IMAGE_SIZES[:1] if quick else IMAGE_SIZES
+        zip_kwargs = dict(
+            partner_id=PARTNER_ID,
+            callback_url="https://callback.example.com",
+            upload_url="https://upload.example.com",
+            partner_params=params,
+            id_info_params=id_info,
+            sec_key="sec_key",
+            timestamp=int(time.time()),
+        )
+        for count in counts:
+            for size in sizes:
+                images = make_images(directory, count, size)
+                results.append(
+                    measure(
+                        "image_upload.prepare_info_json",
+                        lambda: prepare_info_json(image_params=images, **zip_kwargs),
+                        repeat * 10,
+                        image_count=count,
+                    )
+                )
+                results.append(
+                    measure(
+                        "image_upload.generate_zip_file",
+                        lambda: generate_zip_file(image_params=images, **zip_kwargs),
+                        repeat,
+                        image_count=count,
+                        image_size=size,
+                    )
+                )
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    results.append(
+                        measure(
+                            "image_upload.generate_zip_file.parallel",
+                            lambda: generate_zip_file(
+                                image_params=images, executor=executor, **zip_kwargs
+                            ),
+                            repeat,
+                            image_count=count,
+                            image_size=size,
+                        )
+                    )
+
+        with StubServer() as server:
+            web_api = WebApi(
+                PARTNER_ID, "https://callback.example.com", api_key, server.url
+            )
+            pipelined_web_api = WebApi(
+                PARTNER_ID,
+                "https://callback.example.com",
+                api_key,
+                server.url,
+                pipeline_zip=True,
+            )
+            id_api = IdApi(PARTNER_ID, api_key, server.url)
+            utilities = Utilities(PARTNER_ID, api_key, server.url)
+            options = {
+                "return_job_status": False,
+                "return_history": False,
+                "return_images": False,
+            }
+            for count in counts:
+                images = make_images(directory, count, IMAGE_SIZES[0])
+                results.append(
+                    measure(
+                        "web_api.submit_job",
+                        lambda: web_api.submit_job(
+                            partner_params(), images, id_info_params(), options
+                        ),
+                        repeat,
+                        image_count=count,
+                        image_size=IMAGE_SIZES[0],
+                    )
+                )
+                results.append(
+                    measure(
+                        "web_api.submit_job.pipelined",
+                        lambda: pipelined_web_api.submit_job(
+                            partner_params(), images, id_info_params(), options
+                        ),
+                        repeat,
+                        image_count=count,
+                        image_size=IMAGE_SIZES[0],
+                    )
+                )
+            results.append(
+                measure(
+                    "id_api.submit_job",
+                    lambda: id_api.submit_job(partner_params(5), id_info_params()),
+                    repeat,
+                )
+            )
+            results.append(
+                measure(
+                    "utilities.get_job_status",
+                    lambda: utilities.get_job_status(params, None, None, None),
+                    repeat,
+                )
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--quick", action="store_true", help="fewer parameter sets")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "sdk_version": sdk_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "results": run(args.repeat, args.quick),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
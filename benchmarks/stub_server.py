@@ -0,0 +1,143 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = ["StubServer", "SERVICES"]
+
+SERVICES = {
+    "id_types": {
+        "NG": {
+            "BVN": ["country", "id_type", "id_number", "user_id", "job_id"],
+            "PASSPORT": [
+                "country",
+                "id_type",
+                "id_number",
+                "user_id",
+                "job_id",
+                "first_name",
+                "last_name",
+                "dob",
+            ],
+        }
+    }
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *_):
+        pass
+
+    def __read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def __respond(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.endswith("/services"):
+            return self.__respond(200, SERVICES)
+        return self.__respond(404, {"error": "not found"})
+
+    def do_POST(self):
+        request = json.loads(self.__read_body() or b"{}")
+        server = self.server
+        if self.path.endswith("/upload"):
+            smile_job_id = "{:010d}".format(next(server.job_ids))
+            return self.__respond(
+                200,
+                {
+                    "upload_url": server.url + "/bucket/" + smile_job_id,
+                    "smile_job_id": smile_job_id,
+                },
+            )
+        if self.path.endswith("/job_status"):
+            return self.__respond(
+                200,
+                {
+                    "timestamp": request.get("timestamp"),
+                    "signature": request.get("sec_key"),
+                    "job_complete": True,
+                    "job_success": True,
+                    "code": "2302",
+                },
+            )
+        if self.path.endswith("/id_verification"):
+            return self.__respond(
+                200,
+                {
+                    "SmileJobID": "0000000001",
+                    "PartnerParams": request.get("partner_params"),
+                    "ResultCode": "1012",
+                    "ResultText": "ID Number Validated",
+                    "timestamp": request.get("timestamp"),
+                    "signature": request.get("sec_key"),
+                },
+            )
+        return self.__respond(404, {"error": "not found"})
+
+    def do_PUT(self):
+        body = self.__read_body()
+        self.server.uploaded_bytes += len(body)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class StubServer:
+    # Stand-in for the Smile Identity API and the presigned upload host, served
+    # from one local ThreadingHTTPServer with keep-alive enabled.
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.url = "http://{}:{}".format(*self.httpd.server_address)
+        self.httpd.job_ids = itertools.count(1)
+        self.httpd.uploaded_bytes = 0
+        self.__thread = None
+
+    @property
+    def url(self):
+        return self.httpd.url
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with StubServer(port=8000) as server:
+        print("Stub Smile Identity API listening on " + server.url)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -26,4 +26,9 @@ setup(
         "requests ~= 2.24.0",
         "pycryptodome ~= 3.9.8",
     ],
+    extras_require={
+        "async": ["aiohttp >= 3.6"],
+        "orjson": ["orjson >= 3"],
+        "images": ["Pillow >= 8"],
+    },
 )
@@ -0,0 +1,98 @@
+from smile_id_core.AsyncTransport import get_default_async_transport
+from smile_id_core.AsyncUtilities import AsyncUtilities
+from smile_id_core.IdApi import IdApi
+from smile_id_core.Utilities import SEC_KEY_TTL, _SecKeyWindow
+from smile_id_core.bulk import run_bounded_async
+from smile_id_core.models import model_payload, partner_params_payload
+
+__all__ = ["AsyncIdApi"]
+
+
+class AsyncIdApi(IdApi):
+    def __init__(
+        self,
+        partner_id,
+        api_key,
+        sid_server,
+        transport=None,
+        tracer=None,
+        services_snapshot=None,
+    ):
+        super().__init__(
+            partner_id,
+            api_key,
+            sid_server,
+            transport or get_default_async_transport(),
+            tracer,
+            services_snapshot,
+        )
+
+    async def submit_job(self, partner_params, id_params, use_validation_api=True):
+        with self.tracer.span("smile_id.id_api.submit_job", partner_id=self.partner_id):
+            return await self.__submit_job(
+                partner_params, id_params, use_validation_api, self._get_sec_key
+            )
+
+    def submit_jobs(
+        self,
+        jobs,
+        max_workers=8,
+        preserve_order=False,
+        use_validation_api=True,
+        sec_key_ttl=SEC_KEY_TTL,
+    ):
+        # An async iterator of JobResult, at most `max_workers` jobs run at once.
+        # A sec_key is reused for `sec_key_ttl` seconds, and the services cache
+        # makes a single request for the whole batch.
+        sec_keys = _SecKeyWindow(self._get_sec_key, sec_key_ttl)
+
+        async def submit(job):
+            partner_params, id_params, job_use_validation_api = IdApi._job_arguments(
+                job, use_validation_api
+            )
+            with self.tracer.span(
+                "smile_id.id_api.submit_job", partner_id=self.partner_id
+            ):
+                return await self.__submit_job(
+                    partner_params, id_params, job_use_validation_api, sec_keys.get
+                )
+
+        return run_bounded_async(submit, jobs, max_workers, preserve_order)
+
+    async def __submit_job(
+        self, partner_params, id_params, use_validation_api, get_sec_key
+    ):
+        partner_params = partner_params_payload(partner_params)
+
+        if not id_params:
+            raise ValueError("Please ensure that you send through ID Information")
+        id_params = model_payload(id_params)
+
+        with self.tracer.span("smile_id.validate_id_params"):
+            await AsyncUtilities.validate_id_params(
+                self.url,
+                id_params,
+                partner_params,
+                use_validation_api,
+                self.transport,
+            )
+
+        if partner_params.get("job_type") != 5:
+            raise ValueError(
+                "Please ensure that you are setting your job_type to 5 to query ID Api"
+            )
+
+        with self.tracer.span("smile_id.sign"):
+            sec_key_object = get_sec_key()
+        payload = self._configure_json(
+            partner_params,
+            id_params,
+            sec_key_object["sec_key"],
+            sec_key_object["timestamp"],
+        )
+        with self.tracer.span("smile_id.id_verification") as span:
+            response = await AsyncUtilities.execute_post(
+                self.url + "/id_verification", payload, self.transport
+            )
+            span.set_attribute("http.status_code", response.status_code)
+        return self._confirm_response(response)
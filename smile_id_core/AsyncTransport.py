@@ -0,0 +1,188 @@
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None
+
+from smile_id_core.json_codec import loads
+from smile_id_core.retry import (
+    EndpointPolicies,
+    is_failure,
+    is_replayable,
+    phase_for,
+)
+
+__all__ = [
+    "AsyncTransport",
+    "AsyncResponse",
+    "get_default_async_transport",
+    "set_default_async_transport",
+]
+
+
+class AsyncResponse:
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return loads(self.content)
+
+
+class AsyncTransport:
+    def __init__(
+        self,
+        pool_maxsize=100,
+        upload_pool_maxsize=100,
+        timeout=None,
+        retry_policy=None,
+        retry_policies=None,
+        breaker_factory=None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for the async clients, "
+                "install it with `pip install smile_id_core[async]`"
+            )
+        self.pool_maxsize = pool_maxsize
+        self.upload_pool_maxsize = upload_pool_maxsize
+        self.timeout = timeout
+        self.policies = EndpointPolicies(retry_policy, retry_policies, breaker_factory)
+        self.__loop_sessions = {}
+        self.__guards = {}
+
+    def __build_session(self, limit):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    def __sessions(self):
+        # aiohttp sessions are bound to the loop they were created on, so every
+        # loop gets its own. A guard task closes them when the loop shuts down,
+        # asyncio.run cancels it then, so sessions don't outlive their loop.
+        loop = asyncio.get_running_loop()
+        sessions = self.__loop_sessions.get(loop)
+        if sessions is None:
+            sessions = (
+                self.__build_session(self.pool_maxsize),
+                self.__build_session(self.upload_pool_maxsize),
+            )
+            self.__loop_sessions[loop] = sessions
+            self.__guards[loop] = loop.create_task(
+                self.__close_on_shutdown(loop, sessions)
+            )
+        return sessions
+
+    async def __close_on_shutdown(self, loop, sessions):
+        try:
+            await loop.create_future()
+        finally:
+            if self.__loop_sessions.get(loop) is sessions:
+                del self.__loop_sessions[loop]
+            self.__guards.pop(loop, None)
+            for session in sessions:
+                await session.close()
+
+    @staticmethod
+    async def __send(session, method, url, data=None, headers=None):
+        async with session.request(method, url, data=data, headers=headers) as resp:
+            content = await resp.read()
+            return AsyncResponse(resp.status, resp.reason, resp.headers, content)
+
+    async def __request(self, session, method, url, data=None, headers=None):
+        if not self.policies.enabled:
+            return await AsyncTransport.__send(session, method, url, data, headers)
+
+        phase = phase_for(method, url)
+        policy = self.policies.retry_policy(phase)
+        if not is_replayable(data):
+            policy = None
+        breaker = self.policies.breaker(phase)
+        if policy is not None:
+            policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_request(phase)
+            try:
+                response = await AsyncTransport.__send(
+                    session, method, url, data, headers
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                retryable = isinstance(
+                    e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+                )
+                delay = policy.retry_delay(attempt) if policy and retryable else None
+                if delay is None:
+                    raise
+            else:
+                if breaker is not None:
+                    if is_failure(response.status_code):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if policy is None or response.status_code not in policy.retry_statuses:
+                    return response
+                delay = policy.retry_delay(attempt)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+
+    async def get(self, url, headers=None):
+        api_session, _ = self.__sessions()
+        return await self.__request(api_session, "GET", url, headers=headers)
+
+    async def post(self, url, data=None, headers=None):
+        api_session, _ = self.__sessions()
+        return await self.__request(
+            api_session, "POST", url, data=data, headers=headers
+        )
+
+    async def put(self, url, data=None, headers=None):
+        _, upload_session = self.__sessions()
+        return await self.__request(
+            upload_session, "PUT", url, data=data, headers=headers
+        )
+
+    async def close(self):
+        # Closes the sessions of the running loop.
+        guard = self.__guards.get(asyncio.get_running_loop())
+        if guard is not None:
+            guard.cancel()
+            await asyncio.wait([guard])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+_default_async_transport = None
+
+
+def get_default_async_transport():
+    global _default_async_transport
+    if _default_async_transport is None:
+        _default_async_transport = AsyncTransport()
+    return _default_async_transport
+
+
+def set_default_async_transport(transport):
+    global _default_async_transport
+    _default_async_transport = transport
@@ -0,0 +1,160 @@
+from smile_id_core.AsyncTransport import get_default_async_transport
+from smile_id_core.ServerError import ServerError
+from smile_id_core.ServicesCache import get_default_services_cache
+from smile_id_core.Utilities import SEC_KEY_TTL, Utilities, _SecKeyWindow
+from smile_id_core.bulk import run_bounded_async
+from smile_id_core.json_codec import dumps, response_json
+
+__all__ = ["AsyncUtilities"]
+
+
+class AsyncUtilities(Utilities):
+    def __init__(
+        self,
+        partner_id,
+        api_key,
+        sid_server,
+        transport=None,
+        tracer=None,
+        job_status_cache=None,
+        services_snapshot=None,
+    ):
+        super().__init__(
+            partner_id,
+            api_key,
+            sid_server,
+            transport or get_default_async_transport(),
+            tracer,
+            job_status_cache,
+            services_snapshot,
+        )
+
+    async def get_job_status(self, partner_params, option_params, sec_key, timestamp):
+        with self.tracer.span(
+            "smile_id.get_job_status", partner_id=self.partner_id
+        ) as span:
+            Utilities.validate_partner_params(partner_params)
+            option_params = Utilities._job_status_options(option_params)
+            cache_key, job_status = self._cached_job_status(
+                partner_params, option_params
+            )
+            span.set_attribute("cache.hit", job_status is not None)
+            if job_status is not None:
+                return job_status
+
+            if sec_key is None:
+                with self.tracer.span("smile_id.sign"):
+                    sec_key_object = self._get_sec_key()
+                sec_key = sec_key_object["sec_key"]
+                timestamp = sec_key_object["timestamp"]
+
+            with self.tracer.span("smile_id.job_status") as span:
+                job_status = await AsyncUtilities.execute_post(
+                    self.url + "/job_status",
+                    self._configure_job_query(
+                        partner_params.get("user_id"),
+                        partner_params.get("job_id"),
+                        option_params,
+                        sec_key,
+                        timestamp,
+                    ),
+                    self.transport,
+                )
+                span.set_attribute("http.status_code", job_status.status_code)
+            job_status = self._confirm_job_status(job_status)
+            self._cache_job_status(cache_key, job_status)
+            return job_status
+
+    def get_job_statuses(
+        self,
+        partner_params_list,
+        option_params=None,
+        max_workers=8,
+        preserve_order=False,
+        sec_key_ttl=SEC_KEY_TTL,
+    ):
+        # An async iterator of JobResult, at most `max_workers` queries run at once.
+        sec_keys = _SecKeyWindow(self._get_sec_key, sec_key_ttl)
+
+        async def query(partner_params):
+            sec_key_object = sec_keys.get()
+            return await self.get_job_status(
+                partner_params,
+                option_params,
+                sec_key_object["sec_key"],
+                sec_key_object["timestamp"],
+            )
+
+        return run_bounded_async(
+            query, partner_params_list, max_workers, preserve_order
+        )
+
+    @staticmethod
+    async def validate_id_params(
+        sid_server,
+        id_info_params,
+        partner_params,
+        use_validation_api=True,
+        transport=None,
+        services_cache=None,
+    ):
+        if not Utilities.validate_id_fields(id_info_params) or not use_validation_api:
+            return
+
+        index = await AsyncUtilities.get_services_index(
+            sid_server, transport, services_cache
+        )
+        index.validate(id_info_params, partner_params)
+
+    @staticmethod
+    async def get_services_index(sid_server, transport=None, services_cache=None):
+        async def load():
+            response = await AsyncUtilities.get_smile_id_services(sid_server, transport)
+            return response_json(response)
+
+        services_cache = services_cache or get_default_services_cache()
+        return await services_cache.get_index_async(sid_server, load)
+
+    @staticmethod
+    async def get_smile_id_services(sid_server, transport=None):
+        if sid_server in [0, 1]:
+            sid_server_map = {
+                0: "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
+                1: "https://la7am6gdm8.execute-api.us-west-2.amazonaws.com/prod",
+            }
+            url = sid_server_map[sid_server]
+        else:
+            url = sid_server
+        response = await AsyncUtilities.execute_get(url + "/services", transport)
+        if response.status_code != 200:
+            raise ServerError(
+                "Failed to get to {}, status={}, response={}".format(
+                    url + "/services", response.status_code, response_json(response)
+                )
+            )
+        return response
+
+    @staticmethod
+    async def execute_get(url, transport=None):
+        transport = transport or get_default_async_transport()
+        return await transport.get(
+            url,
+            headers={
+                "Accept": "application/json",
+                "Accept-Language": "en_US",
+            },
+        )
+
+    @staticmethod
+    async def execute_post(url, payload, transport=None):
+        data = dumps(payload)
+        transport = transport or get_default_async_transport()
+        return await transport.post(
+            url,
+            data=data,
+            headers={
+                "Accept": "application/json",
+                "Accept-Language": "en_US",
+                "Content-type": "application/json",
+            },
+        )
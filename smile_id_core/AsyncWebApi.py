@@ -0,0 +1,399 @@
+import asyncio
+import functools
+
+from smile_id_core.AsyncIdApi import AsyncIdApi
+from smile_id_core.AsyncTransport import get_default_async_transport
+from smile_id_core.AsyncUtilities import AsyncUtilities
+from smile_id_core.JobPoller import MAX_POLLS, poll_interval
+from smile_id_core.image_upload import PendingZipFile, generate_zip_file
+from smile_id_core.models import (
+    Options,
+    images_payload,
+    partner_params_payload,
+    model_payload,
+)
+from smile_id_core.ServerError import ServerError, UploadError
+from smile_id_core.UploadHandle import UploadHandle
+from smile_id_core.bulk import run_bounded_async
+from smile_id_core.WebApi import _DEFAULT_ID_INFO, _DEFAULT_OPTIONS, WebApi
+from smile_id_core.json_codec import response_json
+
+__all__ = ["AsyncWebApi"]
+
+
+class AsyncWebApi(WebApi):
+    def __init__(
+        self,
+        partner_id,
+        call_back_url,
+        api_key,
+        sid_server,
+        transport=None,
+        compresslevel=None,
+        tracer=None,
+        zip_executor=None,
+        callback_receiver=None,
+        callback_timeout=60,
+        pipeline_zip=False,
+        image_preprocessor=None,
+        services_snapshot=None,
+    ):
+        super().__init__(
+            partner_id,
+            call_back_url,
+            api_key,
+            sid_server,
+            transport or get_default_async_transport(),
+            compresslevel=compresslevel,
+            tracer=tracer,
+            zip_executor=zip_executor,
+            pipeline_zip=pipeline_zip,
+            image_preprocessor=image_preprocessor,
+            services_snapshot=services_snapshot,
+        )
+        self.callback_receiver = callback_receiver
+        self.callback_timeout = callback_timeout
+
+    async def submit_job(
+        self,
+        partner_params,
+        images_params,
+        id_info_params,
+        options_params,
+        use_validation_api=True,
+    ):
+        with self.tracer.span("smile_id.submit_job", partner_id=self.partner_id):
+            return await self.__submit_job(
+                partner_params,
+                images_params,
+                id_info_params,
+                options_params,
+                use_validation_api,
+            )
+
+    async def __submit_job(
+        self,
+        partner_params,
+        images_params,
+        id_info_params,
+        options_params,
+        use_validation_api,
+    ):
+        partner_params = partner_params_payload(partner_params)
+        job_type = partner_params["job_type"]
+
+        if not id_info_params:
+            if job_type == 5:
+                await AsyncUtilities.validate_id_params(
+                    self.url,
+                    id_info_params,
+                    partner_params,
+                    use_validation_api,
+                    self.transport,
+                )
+            id_info_params = _DEFAULT_ID_INFO.to_dict()
+        else:
+            id_info_params = model_payload(id_info_params)
+
+        if job_type == 5:
+            return await self._get_id_api().submit_job(
+                partner_params, id_info_params, use_validation_api
+            )
+
+        if not options_params:
+            options_params = _DEFAULT_OPTIONS
+
+        with self.tracer.span("smile_id.validate", job_type=job_type):
+            if isinstance(options_params, Options):
+                options_params = options_params.to_dict()
+            else:
+                self._validate_options(options_params)
+            images_params = images_payload(images_params)
+        with self.tracer.span("smile_id.validate_id_params"):
+            await AsyncUtilities.validate_id_params(
+                self.url,
+                id_info_params,
+                partner_params,
+                use_validation_api,
+                self.transport,
+            )
+        self._validate_return_data(options_params)
+
+        with self.tracer.span("smile_id.sign"):
+            sec_key_object = self._get_sec_key()
+        sec_key = sec_key_object["sec_key"]
+        timestamp = sec_key_object["timestamp"]
+
+        zip_kwargs = dict(
+            partner_id=self.partner_id,
+            sec_key=sec_key,
+            timestamp=timestamp,
+            callback_url=self.call_back_url,
+            partner_params=partner_params,
+            id_info_params=id_info_params,
+        )
+        if self.pipeline_zip:
+            # Only info.json needs the upload_url, so the images are read and
+            # compressed while the prep request is in flight.
+            prep_upload, pending_zip = await asyncio.gather(
+                self.__prep_upload(partner_params, sec_key, timestamp),
+                self.__zip_images(images_params),
+                return_exceptions=True,
+            )
+            for result in (prep_upload, pending_zip):
+                if isinstance(result, BaseException):
+                    if isinstance(pending_zip, PendingZipFile):
+                        pending_zip.discard()
+                    raise result
+            upload_url, smile_job_id = prep_upload
+            with self.tracer.span("smile_id.zip_finish") as span:
+                zip_stream = pending_zip.finish(
+                    upload_url=upload_url, zero_copy=True, **zip_kwargs
+                )
+                span.set_attribute("zip.bytes", len(zip_stream))
+        else:
+            upload_url, smile_job_id = await self.__prep_upload(
+                partner_params, sec_key, timestamp
+            )
+            images_params = await self.__preprocess_images(images_params)
+            # Reading and compressing the images is blocking work, keep it off the loop.
+            with self.tracer.span("smile_id.zip") as span:
+                zip_stream = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(
+                        generate_zip_file,
+                        image_params=images_params,
+                        upload_url=upload_url,
+                        zero_copy=True,
+                        compresslevel=self.compresslevel,
+                        executor=self.zip_executor,
+                        **zip_kwargs,
+                    ),
+                )
+                span.set_attribute("zip.bytes", len(zip_stream))
+        handle = UploadHandle(
+            upload_url, smile_job_id, partner_params, options_params, zip_stream
+        )
+        return await self.__upload_and_finish(handle, sec_key, timestamp)
+
+    async def __prep_upload(self, partner_params, sec_key, timestamp):
+        with self.tracer.span("smile_id.prep_upload") as span:
+            prep_upload = await AsyncWebApi.execute_http(
+                self.url + "/upload",
+                self._prepare_prep_upload_payload(partner_params, sec_key, timestamp),
+                self.transport,
+            )
+            span.set_attribute("http.status_code", prep_upload.status_code)
+        if prep_upload.status_code != 200:
+            raise ServerError(
+                "Failed to post entity to {}, status={}, response={}".format(
+                    self.url + "/upload",
+                    prep_upload.status_code,
+                    response_json(prep_upload),
+                )
+            )
+        prep_upload_json_resp = response_json(prep_upload)
+        return (
+            prep_upload_json_resp["upload_url"],
+            prep_upload_json_resp["smile_job_id"],
+        )
+
+    async def __preprocess_images(self, images_params):
+        if self.image_preprocessor is None:
+            return images_params
+        with self.tracer.span("smile_id.preprocess_images") as span:
+            (
+                images_params,
+                bytes_saved,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                None, self.image_preprocessor.process, images_params, self.zip_executor
+            )
+            span.set_attribute("images.bytes_saved", bytes_saved)
+        return images_params
+
+    async def __zip_images(self, images_params):
+        images_params = await self.__preprocess_images(images_params)
+        with self.tracer.span("smile_id.zip", pipelined=True):
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                PendingZipFile,
+                images_params,
+                self.compresslevel,
+                self.zip_executor,
+            )
+
+    def submit_jobs(
+        self, jobs, max_workers=8, preserve_order=False, use_validation_api=True
+    ):
+        # An async iterator of JobResult, at most `max_workers` jobs run at once.
+        return run_bounded_async(
+            lambda job: self.submit_job(
+                *WebApi._job_arguments(job, use_validation_api)
+            ),
+            jobs,
+            max_workers,
+            preserve_order,
+        )
+
+    async def validate_jobs(self, jobs, use_validation_api=True):
+        # The jobs are checked off the loop, since looking for image files is
+        # blocking work. The services list is fetched on the loop, and only
+        # when the first job needs it.
+        loop = asyncio.get_running_loop()
+        services_index = []
+
+        def get_services_index():
+            if not services_index:
+                services_index.append(
+                    asyncio.run_coroutine_threadsafe(
+                        AsyncUtilities.get_services_index(self.url, self.transport),
+                        loop,
+                    ).result()
+                )
+            return services_index[0]
+
+        return await loop.run_in_executor(
+            None, self._validate_jobs, jobs, use_validation_api, get_services_index
+        )
+
+    async def resume_upload(self, handle):
+        with self.tracer.span(
+            "smile_id.resume_upload", partner_id=self.partner_id
+        ) as span:
+            span.set_attribute("upload.attempts", handle.attempts)
+            handle.rewind()
+            return await self.__upload_and_finish(handle, None, None)
+
+    async def __upload_and_finish(self, handle, sec_key, timestamp):
+        partner_params = handle.partner_params
+        options_params = handle.options_params
+        # Expect the callback before uploading, so it cannot arrive unnoticed.
+        callback = None
+        if options_params["return_job_status"] and self.callback_receiver is not None:
+            callback = self.callback_receiver.expect(
+                handle.smile_job_id,
+                partner_params.get("user_id"),
+                partner_params.get("job_id"),
+            )
+        try:
+            await self.__upload(handle)
+            return await self.__finish_job(handle, callback, sec_key, timestamp)
+        finally:
+            if callback is not None:
+                callback.cancel()
+
+    async def __finish_job(self, handle, callback, sec_key, timestamp):
+        if handle.options_params["return_job_status"]:
+            job_status = await self.__wait_for_job_status(
+                handle, callback, sec_key, timestamp
+            )
+            job_status_response = response_json(job_status)
+            job_status_response["success"] = True
+            job_status_response["smile_job_id"] = handle.smile_job_id
+            return job_status
+        else:
+            return {"success": True, "smile_job_id": handle.smile_job_id}
+
+    async def __wait_for_job_status(self, handle, callback, sec_key, timestamp):
+        partner_params = handle.partner_params
+        options_params = handle.options_params
+        counter = 0
+        if callback is not None:
+            # The callback only says the job is done, the result is always
+            # fetched with a signed job_status request.
+            with self.tracer.span("smile_id.wait_for_callback") as span:
+                try:
+                    await asyncio.wait_for(callback, self.callback_timeout)
+                    span.set_attribute("callback.received", True)
+                except asyncio.TimeoutError:
+                    span.set_attribute("callback.received", False)
+                    callback = None
+        if callback is not None:
+            job_status = await self._get_utilities().get_job_status(
+                partner_params, options_params, sec_key, timestamp
+            )
+            if response_json(job_status)["job_complete"]:
+                return job_status
+            counter = 1
+        with self.tracer.span("smile_id.poll_job_status"):
+            return await self.poll_job_status(
+                counter, partner_params, options_params, sec_key, timestamp
+            )
+
+    async def __upload(self, handle):
+        handle.attempts += 1
+        upload_size = handle.size
+        try:
+            with self.tracer.span("smile_id.upload") as span:
+                upload_response = await AsyncWebApi.upload(
+                    handle.upload_url, handle.body, self.transport
+                )
+                span.set_attribute("upload.bytes", upload_size)
+                span.set_attribute("http.status_code", upload_response.status_code)
+        except Exception as e:
+            raise UploadError(
+                "Failed to post entity to {}, error={!r}".format(handle.upload_url, e),
+                handle,
+            ) from e
+        if upload_response.status_code != 200:
+            raise UploadError(
+                "Failed to post entity to {}, status={}, response={}".format(
+                    handle.upload_url,
+                    upload_response.status_code,
+                    upload_response.text,
+                ),
+                handle,
+            )
+        handle.close()
+
+    async def poll_job_status(
+        self, counter, partner_params, options_params, sec_key=None, timestamp=None
+    ):
+        if sec_key is None:
+            sec_key_object = self._get_sec_key()
+            sec_key = sec_key_object["sec_key"]
+            timestamp = sec_key_object["timestamp"]
+
+        while True:
+            counter = counter + 1
+            await asyncio.sleep(poll_interval(counter))
+            job_status = await self._get_utilities().get_job_status(
+                partner_params, options_params, sec_key, timestamp
+            )
+            if response_json(job_status)["job_complete"] or counter >= MAX_POLLS:
+                return job_status
+
+    def _get_id_api(self):
+        if self.id_api is None:
+            self.id_api = AsyncIdApi(
+                self.partner_id,
+                self.api_key,
+                self.sid_server,
+                self.transport,
+                self.tracer,
+            )
+            self.id_api.signature = self._get_signature()
+        return self.id_api
+
+    def _get_utilities(self):
+        if self.utilities is None:
+            self.utilities = AsyncUtilities(
+                self.partner_id,
+                self.api_key,
+                self.sid_server,
+                self.transport,
+                self.tracer,
+            )
+            self.utilities.signature = self._get_signature()
+        return self.utilities
+
+    @staticmethod
+    async def execute_http(url, payload, transport=None):
+        return await AsyncUtilities.execute_post(url, payload, transport)
+
+    @staticmethod
+    async def upload(url, file, transport=None):
+        transport = transport or get_default_async_transport()
+        return await transport.put(
+            url, data=file, headers={"Content-type": "application/zip"}
+        )
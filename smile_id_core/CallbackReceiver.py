@@ -0,0 +1,130 @@
+import asyncio
+import collections
+
+try:
+    from aiohttp import web
+except ImportError:  # pragma: no cover - exercised only without the extra
+    web = None
+
+from smile_id_core.json_codec import loads
+
+__all__ = ["CallbackReceiver"]
+
+
+class CallbackReceiver:
+    # Small local HTTP server for Smile Identity callbacks. Every callback
+    # resolves the future returned by `expect` for its SmileJobID or its
+    # (user_id, job_id). Callbacks that arrive before anyone expects them are
+    # kept, up to `max_unclaimed`, so they are not lost to a race.
+    #
+    # A callback cannot be authenticated with the public key, anyone can compute
+    # the hash half of its signature. It is only a wake-up: the future resolves
+    # to None and the caller must fetch the result with a signed job_status
+    # request, never trust the callback body.
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8080,
+        path="/callback",
+        max_unclaimed=1024,
+    ):
+        if web is None:
+            raise ImportError(
+                "CallbackReceiver requires aiohttp, install it with `pip install smile_id_core[async]`"
+            )
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_unclaimed = max_unclaimed
+        self.__waiters = {}
+        self.__unclaimed = collections.OrderedDict()
+        self.__runner = None
+
+    @property
+    def url(self):
+        return "http://{}:{}{}".format(self.host, self.port, self.path)
+
+    async def start(self):
+        if self.__runner is not None:
+            return self
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        self.port = runner.addresses[0][1]
+        self.__runner = runner
+        return self
+
+    async def stop(self):
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+        for future in self.__waiters.values():
+            future.cancel()
+        self.__waiters.clear()
+
+    def expect(self, smile_job_id=None, user_id=None, job_id=None):
+        keys = _keys(smile_job_id, user_id, job_id)
+        if not keys:
+            raise ValueError("Please provide a smile_job_id or a user_id and job_id")
+        future = asyncio.get_running_loop().create_future()
+        for key in keys:
+            self.__waiters[key] = future
+        unclaimed = [self.__unclaimed.pop(key, False) for key in keys]
+        if any(unclaimed):
+            future.set_result(None)
+        future.add_done_callback(lambda _: self.__forget(keys, future))
+        return future
+
+    def pending(self):
+        return len(set(self.__waiters.values()))
+
+    async def handle(self, request):
+        try:
+            payload = loads(await request.read())
+            partner_params = payload.get("PartnerParams") or {}
+            keys = _keys(
+                payload.get("SmileJobID"),
+                partner_params.get("user_id"),
+                partner_params.get("job_id"),
+            )
+        except (ValueError, AttributeError, TypeError):
+            return web.Response(status=400)
+        if not keys:
+            return web.Response(status=400)
+
+        if not self.__resolve(keys):
+            for key in keys:
+                self.__unclaimed[key] = True
+            while len(self.__unclaimed) > self.max_unclaimed:
+                self.__unclaimed.popitem(last=False)
+        return web.Response(status=200)
+
+    def __resolve(self, keys):
+        for key in keys:
+            future = self.__waiters.get(key)
+            if future is not None and not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    def __forget(self, keys, future):
+        for key in keys:
+            if self.__waiters.get(key) is future:
+                del self.__waiters[key]
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *_):
+        await self.stop()
+
+
+def _keys(smile_job_id, user_id, job_id):
+    keys = []
+    if smile_job_id:
+        keys.append(("smile_job_id", smile_job_id))
+    if user_id and job_id:
+        keys.append(("partner_params", user_id, job_id))
+    return keys
@@ -1,8 +1,13 @@
-import json
+import threading
+
 from smile_id_core.Signature import Signature
-from smile_id_core.Utilities import Utilities
+from smile_id_core.Utilities import SEC_KEY_TTL, Utilities, _SecKeyWindow
+from smile_id_core.models import Job, model_payload, partner_params_payload
 from smile_id_core.ServerError import ServerError
-import requests
+from smile_id_core.ServicesCache import get_default_services_cache
+from smile_id_core.Transport import get_default_transport
+from smile_id_core.tracing import NOOP_TRACER
+from smile_id_core.json_codec import dumps, response_json
 
 __all__ = ["IdApi"]
 
@@ -11,11 +16,22 @@ class IdApi:
     timestamp = 0
     sec_key = ""
 
-    def __init__(self, partner_id, api_key, sid_server):
+    def __init__(
+        self,
+        partner_id,
+        api_key,
+        sid_server,
+        transport=None,
+        tracer=None,
+        services_snapshot=None,
+    ):
         if not partner_id or not api_key:
             raise ValueError("partner_id or api_key cannot be null or empty")
         self.partner_id = partner_id
         self.api_key = api_key
+        self.transport = transport or get_default_transport()
+        self.tracer = tracer or NOOP_TRACER
+        self.signature = None
         if sid_server in [0, 1]:
             sid_server_map = {
                 0: "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
@@ -24,43 +40,143 @@ class IdApi:
             self.url = sid_server_map[sid_server]
         else:
             self.url = sid_server
+        if services_snapshot is not None:
+            get_default_services_cache().load_snapshot(services_snapshot, self.url)
 
     def submit_job(self, partner_params, id_params, use_validation_api=True):
-        Utilities.validate_partner_params(partner_params)
+        with self.tracer.span("smile_id.id_api.submit_job", partner_id=self.partner_id):
+            return self.__submit_job(
+                partner_params, id_params, use_validation_api, self._get_sec_key
+            )
+
+    def __submit_job(
+        self,
+        partner_params,
+        id_params,
+        use_validation_api,
+        get_sec_key,
+        get_services_index=None,
+    ):
+        partner_params = partner_params_payload(partner_params)
 
         if not id_params:
             raise ValueError("Please ensure that you send through ID Information")
+        id_params = model_payload(id_params)
 
-        Utilities.validate_id_params(
-            self.url, id_params, partner_params, use_validation_api
-        )
+        with self.tracer.span("smile_id.validate_id_params"):
+            if get_services_index is None:
+                Utilities.validate_id_params(
+                    self.url,
+                    id_params,
+                    partner_params,
+                    use_validation_api,
+                    self.transport,
+                )
+            elif Utilities.validate_id_fields(id_params) and use_validation_api:
+                get_services_index().validate(id_params, partner_params)
 
         if partner_params.get("job_type") != 5:
             raise ValueError(
                 "Please ensure that you are setting your job_type to 5 to query ID Api"
             )
 
-        sec_key_object = self.__get_sec_key()
-        payload = self.__configure_json(
+        with self.tracer.span("smile_id.sign"):
+            sec_key_object = get_sec_key()
+        payload = self._configure_json(
             partner_params,
             id_params,
             sec_key_object["sec_key"],
             sec_key_object["timestamp"],
         )
-        response = self.__execute_http(payload)
+        with self.tracer.span("smile_id.id_verification") as span:
+            response = self.__execute_http(payload)
+            span.set_attribute("http.status_code", response.status_code)
+        return self._confirm_response(response)
+
+    def submit_jobs(
+        self,
+        jobs,
+        max_workers=8,
+        preserve_order=False,
+        use_validation_api=True,
+        sec_key_ttl=SEC_KEY_TTL,
+    ):
+        # The whole batch shares one services lookup, and a sec_key is reused
+        # for `sec_key_ttl` seconds instead of being generated for every job.
+        # concurrent.futures is imported here to keep it off the import path of
+        # clients that never run bulk jobs.
+        from smile_id_core.bulk import run_bounded
+
+        sec_keys = _SecKeyWindow(self._get_sec_key, sec_key_ttl)
+        services_index = []
+        services_lock = threading.Lock()
+
+        def get_services_index():
+            with services_lock:
+                if not services_index:
+                    services_index.append(
+                        Utilities.get_services_index(self.url, self.transport)
+                    )
+            return services_index[0]
+
+        def submit(job):
+            partner_params, id_params, job_use_validation_api = IdApi._job_arguments(
+                job, use_validation_api
+            )
+            with self.tracer.span(
+                "smile_id.id_api.submit_job", partner_id=self.partner_id
+            ):
+                return self.__submit_job(
+                    partner_params,
+                    id_params,
+                    job_use_validation_api,
+                    sec_keys.get,
+                    get_services_index,
+                )
+
+        return run_bounded(submit, jobs, max_workers, preserve_order)
+
+    @staticmethod
+    def _job_arguments(job, use_validation_api):
+        # The submit_job arguments of a Job, a dict or a tuple of arguments.
+        if isinstance(job, Job):
+            return (
+                job.partner_params,
+                job.id_info,
+                use_validation_api
+                if job.use_validation_api is None
+                else job.use_validation_api,
+            )
+        if isinstance(job, dict):
+            return (
+                job["partner_params"],
+                job.get("id_params", job.get("id_info_params")),
+                job.get("use_validation_api", use_validation_api),
+            )
+        if len(job) == 2:
+            return tuple(job) + (use_validation_api,)
+        return job
+
+    def _confirm_response(self, response):
         if response.status_code != 200:
             raise ServerError(
                 "Failed to post entity to {}, status={}, response={}".format(
-                    self.url + "/id_verification", response.status_code, response.json()
+                    self.url + "/id_verification",
+                    response.status_code,
+                    response_json(response),
                 )
             )
         return response
 
-    def __get_sec_key(self):
-        sec_key_gen = Signature(self.partner_id, self.api_key)
-        return sec_key_gen.generate_sec_key()
+    def _get_signature(self):
+        if self.signature is None:
+            self.signature = Signature(self.partner_id, self.api_key)
+        return self.signature
+
+    def _get_sec_key(self):
+        return self._get_signature().generate_sec_key()
 
-    def __configure_json(self, partner_params, id_params, sec_key, timestamp):
+    def _configure_json(self, partner_params, id_params, sec_key, timestamp):
         payload = {
             "sec_key": sec_key,
             "timestamp": timestamp,
@@ -71,9 +187,9 @@ class IdApi:
         return payload
 
     def __execute_http(self, payload):
-        data = json.dumps(payload)
-        resp = requests.post(
-            url=self.url + "/id_verification",
+        data = dumps(payload)
+        resp = self.transport.post(
+            self.url + "/id_verification",
             data=data,
             headers={
                 "Accept": "application/json",
@@ -0,0 +1,116 @@
+import io
+import os
+import threading
+
+from smile_id_core.image_upload import (
+    IMAGE_FILE_EXTENSIONS,
+    _image_data,
+    is_image_buffer,
+)
+
+__all__ = ["ImagePreprocessor"]
+
+
+class ImagePreprocessor:
+    # Downscales and re-encodes image files before they are zipped, so large
+    # camera images do not dominate the upload. An image is only touched when
+    # it is above `max_bytes` or its longest side is above `max_dimension`, and
+    # the smaller of the original and the re-encoded JPEG is kept. `image_types`
+    # overrides any of the limits for a given image_type_id.
+    def __init__(
+        self, max_dimension=1600, max_bytes=512 * 1024, quality=85, image_types=None
+    ):
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            raise ImportError(
+                "ImagePreprocessor requires Pillow, install it with `pip install smile_id_core[images]`"
+            )
+        self.Image = Image
+        self.ImageOps = ImageOps
+        self.limits = dict(
+            max_dimension=max_dimension, max_bytes=max_bytes, quality=quality
+        )
+        self.image_types = {
+            str(image_type_id): dict(self.limits, **limits)
+            for image_type_id, limits in (image_types or {}).items()
+        }
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_in - self.bytes_out
+
+    def process(self, image_params, executor=None):
+        # Returns the new image params and the bytes saved for this job.
+        from concurrent.futures import ProcessPoolExecutor
+
+        if executor is None or isinstance(executor, ProcessPoolExecutor):
+            # Pillow releases the GIL while decoding and encoding, so a thread
+            # pool helps, a process pool would copy every image twice.
+            results = [self.process_image(image) for image in image_params]
+        else:
+            results = list(executor.map(self.process_image, image_params))
+        bytes_in = sum(r[1] for r in results)
+        bytes_out = sum(r[2] for r in results)
+        with self.__lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+        return [r[0] for r in results], bytes_in - bytes_out
+
+    def process_image(self, image):
+        # Returns the image params, and its size before and after.
+        source = image["image"]
+        if is_image_buffer(source):
+            file_name = image["file_name"]
+        elif source.lower().endswith(IMAGE_FILE_EXTENSIONS):
+            file_name = os.path.basename(source)
+        else:
+            # base64 images and anything else are sent as they are
+            return image, 0, 0
+        limits = self.image_types.get(str(image["image_type_id"]), self.limits)
+        seekable = hasattr(source, "read") and source.seekable()
+        if seekable:
+            # the image starts where the stream was handed over, not at 0
+            position = source.tell()
+        data = _image_data(source)
+        if hasattr(source, "read"):
+            if seekable:
+                source.seek(position)
+            else:
+                # the stream cannot be read again, send the bytes read from it
+                image = dict(image, image=data)
+        size = len(data)
+
+        try:
+            output = self.__resize(data, size, limits)
+        except OSError:
+            # not something Pillow can read, send it as it is
+            output = None
+        if output is None or output.tell() >= size:
+            return image, size, size
+        image = dict(
+            image,
+            image=output.getbuffer(),
+            file_name=os.path.splitext(file_name)[0] + ".jpg",
+        )
+        return image, size, len(image["image"])
+
+    def __resize(self, data, size, limits):
+        with self.Image.open(io.BytesIO(data)) as original:
+            too_large = max(original.size) > limits["max_dimension"]
+            if not too_large and size <= limits["max_bytes"]:
+                return None
+            resized = self.ImageOps.exif_transpose(original)
+            if too_large:
+                resized.thumbnail(
+                    (limits["max_dimension"], limits["max_dimension"]),
+                    self.Image.LANCZOS,
+                )
+            if resized.mode != "RGB":
+                resized = resized.convert("RGB")
+            output = io.BytesIO()
+            resized.save(output, "JPEG", quality=limits["quality"], optimize=True)
+        return output
@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import threading
+import time
+
+from smile_id_core.json_codec import response_json
+
+__all__ = ["JobPoller", "poll_interval", "MAX_POLLS"]
+
+MAX_POLLS = 20
+
+
+def poll_interval(counter):
+    if counter < 4:
+        return 2
+    return 4
+
+
+class _PendingJob:
+    __slots__ = (
+        "utilities",
+        "partner_params",
+        "options_params",
+        "sec_key",
+        "timestamp",
+        "deadline",
+        "counter",
+        "future",
+    )
+
+    def __init__(
+        self,
+        utilities,
+        partner_params,
+        options_params,
+        sec_key,
+        timestamp,
+        deadline,
+        future,
+    ):
+        self.utilities = utilities
+        self.partner_params = partner_params
+        self.options_params = options_params
+        self.sec_key = sec_key
+        self.timestamp = timestamp
+        self.deadline = deadline
+        self.counter = 0
+        self.future = future
+
+
+class JobPoller:
+    # Tracks any number of pending jobs from one scheduler thread: jobs sit in a
+    # heap ordered by when they are next due, and the thread sleeps until the
+    # earliest one. The job_status requests themselves run on a small pool so a
+    # slow response doesn't hold up the schedule.
+    def __init__(self, max_workers=4, timeout=60, interval=poll_interval):
+        # concurrent.futures is imported here, WebApi imports this module for
+        # poll_interval and shouldn't pull it in.
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.timeout = timeout
+        self.interval = interval
+        self.__heap = []
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__thread = None
+        self.__closed = False
+
+    def register(
+        self,
+        utilities,
+        partner_params,
+        options_params=None,
+        callback=None,
+        timeout=None,
+        sec_key=None,
+        timestamp=None,
+    ):
+        if sec_key is None:
+            sec_key_object = utilities._get_sec_key()
+            sec_key = sec_key_object["sec_key"]
+            timestamp = sec_key_object["timestamp"]
+        timeout = self.timeout if timeout is None else timeout
+
+        from concurrent.futures import Future
+
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        job = _PendingJob(
+            utilities,
+            partner_params,
+            options_params,
+            sec_key,
+            timestamp,
+            time.monotonic() + timeout,
+            future,
+        )
+        self.__schedule(job)
+        return future
+
+    def __schedule(self, job):
+        due = min(time.monotonic() + self.interval(job.counter + 1), job.deadline)
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("JobPoller has been shut down")
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, daemon=True)
+                self.__thread.start()
+            heapq.heappush(self.__heap, (due, next(self.__sequence), job))
+            self.__condition.notify()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__closed:
+                    if not self.__heap:
+                        self.__condition.wait()
+                        continue
+                    delay = self.__heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.__condition.wait(delay)
+                if self.__closed:
+                    return
+                _, _, job = heapq.heappop(self.__heap)
+            self.__executor.submit(self.__poll, job)
+
+    def __poll(self, job):
+        if job.future.cancelled():
+            return
+        job.counter += 1
+        try:
+            job_status = job.utilities.get_job_status(
+                job.partner_params, job.options_params, job.sec_key, job.timestamp
+            )
+            job_complete = response_json(job_status)["job_complete"]
+        except Exception as e:
+            job.future.set_exception(e)
+            return
+        if job_complete or job.counter >= MAX_POLLS or time.monotonic() >= job.deadline:
+            job.future.set_result(job_status)
+            return
+        try:
+            self.__schedule(job)
+        except RuntimeError:
+            job.future.cancel()
+
+    def pending(self):
+        with self.__condition:
+            return len(self.__heap)
+
+    def shutdown(self, wait=True):
+        with self.__condition:
+            self.__closed = True
+            pending, self.__heap = self.__heap, []
+            self.__condition.notify()
+        for _, _, job in pending:
+            job.future.cancel()
+        self.__executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
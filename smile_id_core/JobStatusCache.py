@@ -0,0 +1,64 @@
+import collections
+import threading
+import time
+
+from smile_id_core.json_codec import response_json
+
+__all__ = ["JobStatusCache"]
+
+
+class JobStatusCache:
+    # A job status never changes once `job_complete` is true, so completed
+    # responses are kept here, least recently used first out once `maxsize` is
+    # reached, and dropped after `ttl` seconds when a ttl is given.
+    def __init__(self, maxsize=1024, ttl=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(partner_id, partner_params, option_params):
+        return (
+            partner_id,
+            partner_params.get("user_id"),
+            partner_params.get("job_id"),
+            bool(option_params["return_history"]),
+            bool(option_params["return_images"]),
+        )
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                job_status, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return job_status
+                del self.__entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, job_status):
+        if not response_json(job_status).get("job_complete"):
+            return False
+        with self.__lock:
+            self.__entries[key] = (job_status, time.monotonic())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+        return True
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
@@ -1,6 +1,14 @@
-__all__ = ["ServerError"]
+__all__ = ["ServerError", "UploadError"]
 
 
 class ServerError(Exception):
     def __init__(self, message):
         self.message = message
+
+
+class UploadError(ServerError):
+    # The job was prepared but the presigned PUT of its zip file failed. Pass
+    # `handle` to WebApi.resume_upload to retry just the upload.
+    def __init__(self, message, handle):
+        super().__init__(message)
+        self.handle = handle
@@ -0,0 +1,285 @@
+import json
+import os
+import threading
+import time
+
+__all__ = [
+    "ServicesCache",
+    "ServicesIndex",
+    "SNAPSHOT_VERSION",
+    "read_services_snapshot",
+    "write_services_snapshot",
+    "get_default_services_cache",
+    "set_default_services_cache",
+]
+
+SNAPSHOT_VERSION = 1
+
+
+class ServicesIndex:
+    def __init__(self, services):
+        self.services = services
+        id_types = services["id_types"] or {}
+        self.countries = frozenset(id_types)
+        self.required_keys = {
+            (country, id_type): tuple(keys)
+            for country, country_id_types in id_types.items()
+            for id_type, keys in country_id_types.items()
+        }
+
+    def validate(self, id_info_params, partner_params):
+        if not self.countries:
+            return
+        country = id_info_params["country"]
+        if country not in self.countries:
+            raise ValueError("country " + country + " is invalid")
+        id_type = id_info_params["id_type"]
+        required_keys = self.required_keys.get((country, id_type))
+        if required_keys is None:
+            raise ValueError("id_type " + id_type + " is invalid")
+        for key in required_keys:
+            if key not in id_info_params and key not in partner_params:
+                raise ValueError("key " + key + " is required")
+            if key in id_info_params and not id_info_params[key]:
+                raise ValueError("key " + key + " cannot be empty")
+            if key in partner_params and not partner_params[key]:
+                raise ValueError("key " + key + " cannot be empty")
+
+
+class _Entry:
+    __slots__ = ("index", "fetched_at", "pinned")
+
+    def __init__(self, index, fetched_at, pinned=False):
+        self.index = index
+        self.fetched_at = fetched_at
+        self.pinned = pinned
+
+
+class _Load:
+    # A load in flight on another thread, waited for through `done`.
+    __slots__ = ("done", "index", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.index = None
+        self.error = None
+
+
+class ServicesCache:
+    # The /services schema changes rarely, so serve it from memory for `ttl`
+    # seconds and, for a further `stale_ttl` seconds, keep serving the stale copy
+    # while a single background refresh fetches a new one. A schema loaded from
+    # a snapshot file is refreshed the same way once it is older than `ttl`, but
+    # is never dropped, so validation keeps working while /services is down.
+    def __init__(self, ttl=3600, stale_ttl=86400):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.__entries = {}
+        self.__snapshots = {}
+        self.__refreshing = set()
+        self.__loads = {}
+        self.__async_loads = {}
+        self.__lock = threading.Lock()
+
+    def get_index(self, key, loader):
+        entry, stale = self.__lookup(key)
+        if entry is not None:
+            if stale and self.__start_refresh(key):
+                threading.Thread(
+                    target=self.__refresh_in_background,
+                    args=(key, loader),
+                    daemon=True,
+                ).start()
+            return entry.index
+        return self.__load(key, loader)
+
+    async def get_index_async(self, key, loader):
+        import asyncio
+
+        entry, stale = self.__lookup(key)
+        if entry is not None:
+            if stale and self.__start_refresh(key):
+                asyncio.ensure_future(self.__refresh_in_background_async(key, loader))
+            return entry.index
+        return await self.__load_async(key, loader)
+
+    def put(self, key, services):
+        return self.__store(key, services)
+
+    def load_snapshot(self, path, key=None):
+        # Serves the schema saved in a snapshot file, and writes every schema
+        # fetched for its key back to the file. A missing file is only
+        # remembered when `key` is given, and is written after the first fetch.
+        try:
+            snapshot_key, services, fetched_at = read_services_snapshot(path)
+        except FileNotFoundError:
+            if key is None:
+                raise
+            with self.__lock:
+                self.__snapshots[key] = path
+            return key
+        if key is not None and key != snapshot_key:
+            raise ValueError(
+                "The services snapshot {} is for {}, not {}".format(
+                    path, snapshot_key, key
+                )
+            )
+        age = max(0, time.time() - fetched_at)
+        entry = _Entry(ServicesIndex(services), time.monotonic() - age, True)
+        with self.__lock:
+            self.__snapshots[snapshot_key] = path
+            current = self.__entries.get(snapshot_key)
+            if current is None or current.fetched_at < entry.fetched_at:
+                self.__entries[snapshot_key] = entry
+        return snapshot_key
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __lookup(self, key):
+        # The cached entry, if it can still be used, and whether it is stale.
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None, False
+        age = time.monotonic() - entry.fetched_at
+        if age < self.ttl:
+            return entry, False
+        if age < self.ttl + self.stale_ttl or entry.pinned:
+            return entry, True
+        return None, False
+
+    def __store(self, key, services):
+        index = ServicesIndex(services)
+        with self.__lock:
+            current = self.__entries.get(key)
+            pinned = current is not None and current.pinned
+            self.__entries[key] = _Entry(index, time.monotonic(), pinned)
+            path = self.__snapshots.get(key)
+        if path is not None:
+            try:
+                write_services_snapshot(path, key, services)
+            except OSError:
+                # the new schema is still served from memory
+                pass
+        return index
+
+    def __load(self, key, loader):
+        # Only one caller loads a missing key, the others wait for its result,
+        # so a batch starting on an empty cache makes a single request.
+        with self.__lock:
+            entry, _ = self.__lookup(key)
+            if entry is not None:
+                return entry.index
+            load = self.__loads.get(key)
+            leader = load is None
+            if leader:
+                load = self.__loads[key] = _Load()
+        if not leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.index
+        try:
+            load.index = self.__store(key, loader())
+        except BaseException as e:
+            load.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__loads[key]
+            load.done.set()
+        return load.index
+
+    async def __load_async(self, key, loader):
+        # The same on a loop: callers share one task, shielded so a cancelled
+        # caller doesn't cancel the load for the others.
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            entry, _ = self.__lookup(key)
+            if entry is not None:
+                return entry.index
+            task = self.__async_loads.get((loop, key))
+            if task is None:
+                task = loop.create_task(self.__run_load_async(loop, key, loader))
+                self.__async_loads[(loop, key)] = task
+        return await asyncio.shield(task)
+
+    async def __run_load_async(self, loop, key, loader):
+        try:
+            return self.__store(key, await loader())
+        finally:
+            with self.__lock:
+                del self.__async_loads[(loop, key)]
+
+    def __start_refresh(self, key):
+        with self.__lock:
+            if key in self.__refreshing:
+                return False
+            self.__refreshing.add(key)
+            return True
+
+    def __finish_refresh(self, key):
+        with self.__lock:
+            self.__refreshing.discard(key)
+
+    def __refresh_in_background(self, key, loader):
+        try:
+            self.__store(key, loader())
+        except Exception:
+            # keep serving the stale schema, the next lookup will try again
+            pass
+        finally:
+            self.__finish_refresh(key)
+
+    async def __refresh_in_background_async(self, key, loader):
+        try:
+            self.__store(key, await loader())
+        except Exception:
+            pass
+        finally:
+            self.__finish_refresh(key)
+
+
+def read_services_snapshot(path):
+    with open(path, "rb") as snapshot_file:
+        data = snapshot_file.read()
+    try:
+        snapshot = json.loads(data)
+        version = snapshot["version"]
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(
+                "Unsupported services snapshot version {} in {}".format(version, path)
+            )
+        return snapshot["sid_server"], snapshot["services"], snapshot["fetched_at"]
+    except (KeyError, TypeError):
+        raise ValueError("{} is not a services snapshot".format(path))
+
+
+def write_services_snapshot(path, sid_server, services, fetched_at=None):
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "sid_server": sid_server,
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+        "services": services,
+    }
+    # Written next to the snapshot and moved over it, so a reader never sees
+    # half a file.
+    temp_path = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+    with open(temp_path, "w") as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(temp_path, path)
+
+
+_default_services_cache = ServicesCache()
+
+
+def get_default_services_cache():
+    return _default_services_cache
+
+
+def set_default_services_cache(services_cache):
+    global _default_services_cache
+    _default_services_cache = services_cache
@@ -1,12 +1,23 @@
 import time
 import base64
+import functools
 import hashlib
-from Crypto.PublicKey import RSA
-from Crypto.Cipher import PKCS1_v1_5
 
 __all__ = ["Signature"]
 
 
+@functools.lru_cache(maxsize=128)
+def _load_key(partner_id, api_key):
+    # Parsing the PEM key is by far the most expensive part of signing, so keep
+    # the parsed key and cipher around for the life of the process. pycryptodome
+    # itself is only imported the first time a key is needed.
+    from Crypto.Cipher import PKCS1_v1_5
+    from Crypto.PublicKey import RSA
+
+    public_key = RSA.importKey(api_key)
+    return public_key, PKCS1_v1_5.new(public_key)
+
+
 class Signature:
     def __init__(self, partner_id, api_key):
         if not partner_id or not api_key:
@@ -14,8 +25,7 @@ class Signature:
         self.partner_id = partner_id
         self.api_key = api_key
         self.decoded_api_key = api_key  # base64.b64decode(self.api_key)
-        self.public_key = RSA.importKey(self.decoded_api_key)
-        self.cipher = PKCS1_v1_5.new(self.public_key)
+        self.public_key, self.cipher = _load_key(partner_id, self.decoded_api_key)
 
     def generate_sec_key(self, timestamp=None):
         if timestamp is None:
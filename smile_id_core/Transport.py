@@ -0,0 +1,130 @@
+import threading
+import time
+
+from smile_id_core.retry import (
+    EndpointPolicies,
+    is_failure,
+    is_replayable,
+    phase_for,
+)
+
+__all__ = ["Transport", "get_default_transport", "set_default_transport"]
+
+
+class Transport:
+    def __init__(
+        self,
+        pool_connections=10,
+        pool_maxsize=10,
+        upload_pool_connections=10,
+        upload_pool_maxsize=10,
+        timeout=None,
+        retry_policy=None,
+        retry_policies=None,
+        breaker_factory=None,
+    ):
+        self.timeout = timeout
+        self.policies = EndpointPolicies(retry_policy, retry_policies, breaker_factory)
+        # API calls (/upload, /job_status, /services, /id_verification) and the
+        # presigned PUT go to different hosts, so they get their own pools and
+        # one can't starve the other.
+        self.api_session = Transport.__build_session(pool_connections, pool_maxsize)
+        self.upload_session = Transport.__build_session(
+            upload_pool_connections, upload_pool_maxsize
+        )
+
+    @staticmethod
+    def __build_session(pool_connections, pool_maxsize):
+        # requests is imported here rather than at module level, so importing
+        # the package stays cheap until a transport is actually created.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get(self, url, headers=None):
+        return self.__request(self.api_session, "get", url, headers=headers)
+
+    def post(self, url, data=None, headers=None):
+        return self.__request(self.api_session, "post", url, data=data, headers=headers)
+
+    def put(self, url, data=None, headers=None):
+        return self.__request(
+            self.upload_session, "put", url, data=data, headers=headers
+        )
+
+    def __request(self, session, method, url, **kwargs):
+        send = getattr(session, method)
+        if not self.policies.enabled:
+            return send(url=url, timeout=self.timeout, **kwargs)
+
+        import requests
+
+        phase = phase_for(method.upper(), url)
+        policy = self.policies.retry_policy(phase)
+        if not is_replayable(kwargs.get("data")):
+            policy = None
+        breaker = self.policies.breaker(phase)
+        if policy is not None:
+            policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_request(phase)
+            try:
+                response = send(url=url, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                delay = policy.retry_delay(attempt) if policy and retryable else None
+                if delay is None:
+                    raise
+            else:
+                if breaker is not None:
+                    if is_failure(response.status_code):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if policy is None or response.status_code not in policy.retry_statuses:
+                    return response
+                delay = policy.retry_delay(attempt)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+
+    def close(self):
+        self.api_session.close()
+        self.upload_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+    return _default_transport
+
+
+def set_default_transport(transport):
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -0,0 +1,79 @@
+import tempfile
+
+from smile_id_core.ServerError import ServerError
+
+__all__ = ["UploadHandle"]
+
+
+class UploadHandle:
+    # Everything needed to send a prepared job's zip file again: the presigned
+    # upload_url, its smile_job_id and the zip file itself, either the buffer it
+    # was built in or a spooled copy of the streamed chunks.
+    def __init__(
+        self, upload_url, smile_job_id, partner_params, options_params, body=None
+    ):
+        self.upload_url = upload_url
+        self.smile_job_id = smile_job_id
+        self.partner_params = partner_params
+        self.options_params = options_params
+        self.body = body
+        self.attempts = 0
+        self.__chunks = None
+        self.__spooled = False
+
+    def spool(self, chunks):
+        # Straight to disk, keeping the chunks in memory would undo streaming.
+        self.body = tempfile.TemporaryFile()
+        self.__chunks = self.__tee(chunks)
+        return self.__chunks
+
+    def __tee(self, chunks):
+        for chunk in chunks:
+            self.body.write(chunk)
+            yield chunk
+        self.__spooled = True
+
+    def rewind(self):
+        if self.body is None:
+            raise ServerError(
+                "The zip file of this upload was not kept or has already been released"
+            )
+        if self.__chunks is not None:
+            # A failed streamed upload may have stopped part way through the zip
+            # file, write the rest of it before sending it again.
+            for _ in self.__chunks:
+                pass
+            self.__chunks = None
+            if not self.__spooled:
+                raise ServerError(
+                    "The zip file of this upload was not fully generated and cannot be resumed"
+                )
+        if hasattr(self.body, "seek"):
+            self.body.seek(0)
+        return self.body
+
+    @property
+    def size(self):
+        if hasattr(self.body, "seek"):
+            position = self.body.tell()
+            size = self.body.seek(0, 2)
+            self.body.seek(position)
+            return size
+        return len(self.body)
+
+    def close(self):
+        if hasattr(self.body, "close"):
+            self.body.close()
+        self.body = None
+        self.__chunks = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return "UploadHandle(smile_job_id={!r}, attempts={})".format(
+            self.smile_job_id, self.attempts
+        )
@@ -1,20 +1,44 @@
-import json
-
-import requests
+import threading
+import time
 
 from smile_id_core.Signature import Signature
 from smile_id_core.ServerError import ServerError
+from smile_id_core.ServicesCache import (
+    ServicesIndex,
+    get_default_services_cache,
+    write_services_snapshot,
+)
+from smile_id_core.Transport import get_default_transport
+from smile_id_core.tracing import NOOP_TRACER
+from smile_id_core.json_codec import dumps, response_json
+
+__all__ = ["Utilities", "SEC_KEY_TTL"]
 
-__all__ = ["Utilities"]
+# How long one sec_key is reused across the requests of a bulk query before a
+# fresh one is generated, in seconds.
+SEC_KEY_TTL = 300
 
 
 class Utilities:
-    def __init__(self, partner_id, api_key, sid_server):
+    def __init__(
+        self,
+        partner_id,
+        api_key,
+        sid_server,
+        transport=None,
+        tracer=None,
+        job_status_cache=None,
+        services_snapshot=None,
+    ):
         if not partner_id or not api_key:
             raise ValueError("partner_id or api_key cannot be null or empty")
         self.partner_id = partner_id
         self.api_key = api_key
         self.sid_server = sid_server
+        self.transport = transport or get_default_transport()
+        self.tracer = tracer or NOOP_TRACER
+        self.job_status_cache = job_status_cache
+        self.signature = None
         if sid_server in [0, 1]:
             sid_server_map = {
                 0: "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
@@ -23,58 +47,116 @@ class Utilities:
             self.url = sid_server_map[sid_server]
         else:
             self.url = sid_server
+        if services_snapshot is not None:
+            get_default_services_cache().load_snapshot(services_snapshot, self.url)
 
     def get_job_status(self, partner_params, option_params, sec_key, timestamp):
-        if sec_key is None:
-            sec_key_object = self.__get_sec_key()
-            sec_key = sec_key_object["sec_key"]
-            timestamp = sec_key_object["timestamp"]
+        with self.tracer.span(
+            "smile_id.get_job_status", partner_id=self.partner_id
+        ) as span:
+            Utilities.validate_partner_params(partner_params)
+            option_params = Utilities._job_status_options(option_params)
+            cache_key, job_status = self._cached_job_status(
+                partner_params, option_params
+            )
+            span.set_attribute("cache.hit", job_status is not None)
+            if job_status is not None:
+                return job_status
+
+            if sec_key is None:
+                with self.tracer.span("smile_id.sign"):
+                    sec_key_object = self._get_sec_key()
+                sec_key = sec_key_object["sec_key"]
+                timestamp = sec_key_object["timestamp"]
+
+            job_status = self.__query_job_status(
+                partner_params.get("user_id"),
+                partner_params.get("job_id"),
+                option_params,
+                sec_key,
+                timestamp,
+            )
+            self._cache_job_status(cache_key, job_status)
+            return job_status
+
+    def get_job_statuses(
+        self,
+        partner_params_list,
+        option_params=None,
+        max_workers=8,
+        preserve_order=False,
+        sec_key_ttl=SEC_KEY_TTL,
+    ):
+        # concurrent.futures is imported here to keep it off the import path of
+        # clients that never run bulk queries.
+        from smile_id_core.bulk import run_bounded
+
+        sec_keys = _SecKeyWindow(self._get_sec_key, sec_key_ttl)
+
+        def query(partner_params):
+            sec_key_object = sec_keys.get()
+            return self.get_job_status(
+                partner_params,
+                option_params,
+                sec_key_object["sec_key"],
+                sec_key_object["timestamp"],
+            )
+
+        return run_bounded(query, partner_params_list, max_workers, preserve_order)
 
-        Utilities.validate_partner_params(partner_params)
+    def __query_job_status(self, user_id, job_id, option_params, sec_key, timestamp):
+        with self.tracer.span("smile_id.job_status") as span:
+            job_status = Utilities.execute_post(
+                self.url + "/job_status",
+                self._configure_job_query(
+                    user_id, job_id, option_params, sec_key, timestamp
+                ),
+                self.transport,
+            )
+            span.set_attribute("http.status_code", job_status.status_code)
+        return self._confirm_job_status(job_status)
+
+    def _cached_job_status(self, partner_params, option_params):
+        if self.job_status_cache is None:
+            return None, None
+        key = self.job_status_cache.key(self.partner_id, partner_params, option_params)
+        return key, self.job_status_cache.get(key)
+
+    def _cache_job_status(self, key, job_status):
+        if self.job_status_cache is not None:
+            self.job_status_cache.put(key, job_status)
+
+    @staticmethod
+    def _job_status_options(option_params):
         if not option_params or option_params is None:
-            options = {
+            return {
                 "return_job_status": True,
                 "return_history": False,
                 "return_images": False,
             }
-        else:
-            options = option_params
-        return self.__query_job_status(
-            partner_params.get("user_id"),
-            partner_params.get("job_id"),
-            options,
-            sec_key,
-            timestamp,
-        )
+        return option_params
 
-    def __query_job_status(self, user_id, job_id, option_params, sec_key, timestamp):
-        job_status = Utilities.execute_post(
-            self.url + "/job_status",
-            self.__configure_job_query(
-                user_id, job_id, option_params, sec_key, timestamp
-            ),
-        )
+    def _confirm_job_status(self, job_status):
         if job_status.status_code != 200:
             raise ServerError(
                 "Failed to post entity to {}, response={}:{} - {}",
                 self.url + "/job_status",
                 job_status.status_code,
                 job_status.reason,
-                job_status.json(),
+                response_json(job_status),
             )
         else:
-            job_status_json_resp = job_status.json()
+            job_status_json_resp = response_json(job_status)
             timestamp = job_status_json_resp["timestamp"]
             server_signature = job_status_json_resp["signature"]
-            signature = Signature(self.partner_id, self.api_key)
-            valid = signature.confirm_sec_key(timestamp, server_signature)
+            valid = self._get_signature().confirm_sec_key(timestamp, server_signature)
             if not valid:
                 raise ServerError(
                     "Unable to confirm validity of the job_status response"
                 )
             return job_status
 
-    def __configure_job_query(self, user_id, job_id, options, sec_key, timestamp):
+    def _configure_job_query(self, user_id, job_id, options, sec_key, timestamp):
         return {
             "sec_key": sec_key,
             "timestamp": timestamp,
@@ -85,9 +167,13 @@ class Utilities:
             "history": options["return_history"],
         }
 
-    def __get_sec_key(self):
-        sec_key_gen = Signature(self.partner_id, self.api_key)
-        return sec_key_gen.generate_sec_key()
+    def _get_signature(self):
+        if self.signature is None:
+            self.signature = Signature(self.partner_id, self.api_key)
+        return self.signature
+
+    def _get_sec_key(self):
+        return self._get_signature().generate_sec_key()
 
     @staticmethod
     def validate_partner_params(partner_params):
@@ -115,11 +201,35 @@ class Utilities:
 
     @staticmethod
     def validate_id_params(
-        sid_server, id_info_params, partner_params, use_validation_api=True
+        sid_server,
+        id_info_params,
+        partner_params,
+        use_validation_api=True,
+        transport=None,
+        services_cache=None,
     ):
-        if not id_info_params["entered"]:
+        if not Utilities.validate_id_fields(id_info_params) or not use_validation_api:
             return
 
+        Utilities.get_services_index(sid_server, transport, services_cache).validate(
+            id_info_params, partner_params
+        )
+
+    @staticmethod
+    def get_services_index(sid_server, transport=None, services_cache=None):
+        services_cache = services_cache or get_default_services_cache()
+        return services_cache.get_index(
+            sid_server,
+            lambda: response_json(
+                Utilities.get_smile_id_services(sid_server, transport)
+            ),
+        )
+
+    @staticmethod
+    def validate_id_fields(id_info_params):
+        if not id_info_params["entered"]:
+            return False
+
         for field in ["country", "id_type", "id_number"]:
             if field in id_info_params:
                 if id_info_params[field]:
@@ -128,34 +238,14 @@ class Utilities:
                     raise ValueError("key " + field + " cannot be empty")
             else:
                 raise ValueError("key " + field + " cannot be empty")
-        if not use_validation_api:
-            return
+        return True
 
-        response = Utilities.get_smile_id_services(sid_server)
-        if response.status_code != 200:
-            raise ServerError(
-                "Failed to get to {}, status={}, response={}".format(
-                    url + "/services", response.status_code, response.json()
-                )
-            )
-        response_json = response.json()
-        if response_json["id_types"]:
-            if not id_info_params["country"] in response_json["id_types"]:
-                raise ValueError("country " + id_info_params["country"] + " is invalid")
-            selected_country = response_json["id_types"][id_info_params["country"]]
-            if not id_info_params["id_type"] in selected_country:
-                raise ValueError("id_type " + id_info_params["id_type"] + " is invalid")
-            id_params = selected_country[id_info_params["id_type"]]
-            for key in id_params:
-                if key not in id_info_params and key not in partner_params:
-                    raise ValueError("key " + key + " is required")
-                if key in id_info_params and not id_info_params[key]:
-                    raise ValueError("key " + key + " cannot be empty")
-                if key in partner_params and not partner_params[key]:
-                    raise ValueError("key " + key + " cannot be empty")
+    @staticmethod
+    def validate_id_params_with_services(id_info_params, partner_params, services):
+        ServicesIndex(services).validate(id_info_params, partner_params)
 
     @staticmethod
-    def get_smile_id_services(sid_server):
+    def get_smile_id_services(sid_server, transport=None):
         if sid_server in [0, 1]:
             sid_server_map = {
                 0: "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
@@ -164,19 +254,33 @@ class Utilities:
             url = sid_server_map[sid_server]
         else:
             url = sid_server
-        response = Utilities.execute_get(url + "/services")
+        response = Utilities.execute_get(url + "/services", transport)
         if response.status_code != 200:
             raise ServerError(
                 "Failed to get to {}, status={}, response={}".format(
-                    url + "/services", response.status_code, response.json()
+                    url + "/services", response.status_code, response_json(response)
                 )
             )
         return response
 
     @staticmethod
-    def execute_get(url):
-        resp = requests.get(
-            url=url,
+    def export_services_snapshot(sid_server, path, transport=None):
+        # Saves the /services schema to a file that clients can load with
+        # `services_snapshot=path`, so they can validate before their first fetch.
+        response = Utilities.get_smile_id_services(sid_server, transport)
+        if sid_server in [0, 1]:
+            sid_server_map = {
+                0: "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
+                1: "https://la7am6gdm8.execute-api.us-west-2.amazonaws.com/prod",
+            }
+            sid_server = sid_server_map[sid_server]
+        write_services_snapshot(path, sid_server, response_json(response))
+
+    @staticmethod
+    def execute_get(url, transport=None):
+        transport = transport or get_default_transport()
+        resp = transport.get(
+            url,
             headers={
                 "Accept": "application/json",
                 "Accept-Language": "en_US",
@@ -185,10 +289,11 @@ class Utilities:
         return resp
 
     @staticmethod
-    def execute_post(url, payload):
-        data = json.dumps(payload)
-        resp = requests.post(
-            url=url,
+    def execute_post(url, payload, transport=None):
+        data = dumps(payload)
+        transport = transport or get_default_transport()
+        resp = transport.post(
+            url,
             data=data,
             headers={
                 "Accept": "application/json",
@@ -197,3 +302,21 @@ class Utilities:
             },
         )
         return resp
+
+
+class _SecKeyWindow:
+    # Hands out the same sec_key to every caller until it is `ttl` seconds old.
+    def __init__(self, generate, ttl):
+        self.__generate = generate
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__sec_key_object = None
+        self.__expires_at = 0
+
+    def get(self):
+        with self.__lock:
+            now = time.monotonic()
+            if self.__sec_key_object is None or now >= self.__expires_at:
+                self.__sec_key_object = self.__generate()
+                self.__expires_at = now + self.__ttl
+            return self.__sec_key_object
@@ -1,26 +1,74 @@
-import json
+import contextvars
 import time
 
-import requests
-
-from smile_id_core.image_upload import generate_zip_file, validate_images
+from smile_id_core.image_upload import (
+    PendingZipFile,
+    generate_zip_file,
+    iter_zip_file,
+)
 from smile_id_core.IdApi import IdApi
+from smile_id_core.JobPoller import MAX_POLLS, poll_interval
+from smile_id_core.models import (
+    IdInfo,
+    Job,
+    Options,
+    images_payload,
+    partner_params_payload,
+    model_payload,
+)
 from smile_id_core.Signature import Signature
 from smile_id_core.Utilities import Utilities
-from smile_id_core.ServerError import ServerError
+from smile_id_core.ServerError import ServerError, UploadError
+from smile_id_core.ServicesCache import get_default_services_cache
+from smile_id_core.Transport import get_default_transport
+from smile_id_core.UploadHandle import UploadHandle
+from smile_id_core.tracing import NOOP_TRACER
+from smile_id_core.json_codec import dumps, response_json
 
 __all__ = ["WebApi"]
 
+# Validated once and shared by every job that doesn't send its own, to_dict()
+# hands each job a copy.
+_DEFAULT_ID_INFO = IdInfo()
+_DEFAULT_OPTIONS = Options()
+
 
 class WebApi:
-    def __init__(self, partner_id, call_back_url, api_key, sid_server):
+    def __init__(
+        self,
+        partner_id,
+        call_back_url,
+        api_key,
+        sid_server,
+        transport=None,
+        stream_uploads=False,
+        compresslevel=None,
+        tracer=None,
+        zip_executor=None,
+        pipeline_zip=False,
+        image_preprocessor=None,
+        services_snapshot=None,
+        spool_stream_uploads=False,
+    ):
         if not partner_id or not api_key:
             raise ValueError("partner_id or api_key cannot be null or empty")
+        if stream_uploads and pipeline_zip:
+            raise ValueError("stream_uploads and pipeline_zip cannot be combined")
         self.partner_id = partner_id
         self.call_back_url = call_back_url
         self.api_key = api_key
         self.sid_server = sid_server
+        self.transport = transport or get_default_transport()
+        self.stream_uploads = stream_uploads
+        self.spool_stream_uploads = spool_stream_uploads
+        self.compresslevel = compresslevel
+        self.tracer = tracer or NOOP_TRACER
+        self.zip_executor = zip_executor
+        self.pipeline_zip = pipeline_zip
+        self.image_preprocessor = image_preprocessor
+        self.signature = None
         self.utilities = None
+        self.id_api = None
 
         if sid_server in [0, 1]:
             sid_server_map = {
@@ -30,6 +78,8 @@ class WebApi:
             self.url = sid_server_map[sid_server]
         else:
             self.url = sid_server
+        if services_snapshot is not None:
+            get_default_services_cache().load_snapshot(services_snapshot, self.url)
 
     def submit_job(
         self,
@@ -39,26 +89,38 @@ class WebApi:
         options_params,
         use_validation_api=True,
     ):
+        with self.tracer.span("smile_id.submit_job", partner_id=self.partner_id):
+            return self.__submit_job(
+                partner_params,
+                images_params,
+                id_info_params,
+                options_params,
+                use_validation_api,
+            )
 
-        Utilities.validate_partner_params(partner_params)
+    def __submit_job(
+        self,
+        partner_params,
+        images_params,
+        id_info_params,
+        options_params,
+        use_validation_api,
+    ):
+        partner_params = partner_params_payload(partner_params)
         job_type = partner_params["job_type"]
 
         if not id_info_params:
             if job_type == 5:
                 Utilities.validate_id_params(
-                    self.url, id_info_params, partner_params, use_validation_api
+                    self.url,
+                    id_info_params,
+                    partner_params,
+                    use_validation_api,
+                    self.transport,
                 )
-            id_info_params = {
-                "first_name": None,
-                "middle_name": None,
-                "last_name": None,
-                "country": None,
-                "id_type": None,
-                "id_number": None,
-                "dob": None,
-                "phone_number": None,
-                "entered": False,
-            }
+            id_info_params = _DEFAULT_ID_INFO.to_dict()
+        else:
+            id_info_params = model_payload(id_info_params)
 
         if job_type == 5:
             return self.__call_id_api(
@@ -66,78 +128,323 @@ class WebApi:
             )
 
         if not options_params:
-            options_params = {
-                "return_job_status": True,
-                "return_history": False,
-                "return_images": False,
-            }
+            options_params = _DEFAULT_OPTIONS
 
-        self.__validate_options(options_params)
-        validate_images(images_params)
-        Utilities.validate_id_params(
-            self.url, id_info_params, partner_params, use_validation_api
-        )
-        self.__validate_return_data(options_params)
+        with self.tracer.span("smile_id.validate", job_type=job_type):
+            if isinstance(options_params, Options):
+                options_params = options_params.to_dict()
+            else:
+                self._validate_options(options_params)
+            images_params = images_payload(images_params)
+        with self.tracer.span("smile_id.validate_id_params"):
+            Utilities.validate_id_params(
+                self.url,
+                id_info_params,
+                partner_params,
+                use_validation_api,
+                self.transport,
+            )
+        self._validate_return_data(options_params)
 
-        sec_key_object = self.__get_sec_key()
+        with self.tracer.span("smile_id.sign"):
+            sec_key_object = self._get_sec_key()
         sec_key = sec_key_object["sec_key"]
         timestamp = sec_key_object["timestamp"]
 
-        prep_upload = WebApi.execute_http(
-            self.url + "/upload",
-            self.__prepare_prep_upload_payload(partner_params, sec_key, timestamp),
+        zip_kwargs = dict(
+            partner_id=self.partner_id,
+            sec_key=sec_key,
+            timestamp=timestamp,
+            callback_url=self.call_back_url,
+            partner_params=partner_params,
+            id_info_params=id_info_params,
+        )
+        if self.pipeline_zip:
+            upload_url, smile_job_id, zip_stream = self.__prep_upload_while_zipping(
+                images_params, zip_kwargs
+            )
+            handle = UploadHandle(
+                upload_url, smile_job_id, partner_params, options_params, zip_stream
+            )
+            self.__upload(handle, zip_stream, [len(zip_stream)])
+            return self.__finish_job(handle, sec_key, timestamp)
+
+        upload_url, smile_job_id = self.__prep_upload(
+            partner_params, sec_key, timestamp
+        )
+        zip_kwargs.update(
+            image_params=self.__preprocess_images(images_params),
+            upload_url=upload_url,
+            compresslevel=self.compresslevel,
+            executor=self.zip_executor,
         )
+        handle = UploadHandle(upload_url, smile_job_id, partner_params, options_params)
+        if self.stream_uploads:
+            # sent with chunked transfer encoding, the upload host must allow it,
+            # and the zip is built while it uploads so there is no zip span
+            upload_size = [0]
+            zip_stream = _counted(iter_zip_file(**zip_kwargs), upload_size)
+            if self.spool_stream_uploads:
+                # written to a temporary file as it is sent, so it can be resumed
+                zip_stream = handle.spool(zip_stream)
+        else:
+            with self.tracer.span("smile_id.zip") as span:
+                zip_stream = generate_zip_file(zero_copy=True, **zip_kwargs)
+                span.set_attribute("zip.bytes", len(zip_stream))
+            handle.body = zip_stream
+            upload_size = [len(zip_stream)]
+        self.__upload(handle, zip_stream, upload_size)
+        return self.__finish_job(handle, sec_key, timestamp)
+
+    def __prep_upload(self, partner_params, sec_key, timestamp):
+        with self.tracer.span("smile_id.prep_upload") as span:
+            prep_upload = WebApi.execute_http(
+                self.url + "/upload",
+                self._prepare_prep_upload_payload(partner_params, sec_key, timestamp),
+                self.transport,
+            )
+            span.set_attribute("http.status_code", prep_upload.status_code)
         if prep_upload.status_code != 200:
             raise ServerError(
                 "Failed to post entity to {}, status={}, response={}".format(
-                    self.url + "/upload", prep_upload.status_code, prep_upload.json()
+                    self.url + "/upload",
+                    prep_upload.status_code,
+                    response_json(prep_upload),
                 )
             )
-        else:
-            prep_upload_json_resp = prep_upload.json()
-            upload_url = prep_upload_json_resp["upload_url"]
-            smile_job_id = prep_upload_json_resp["smile_job_id"]
-            zip_stream = generate_zip_file(
-                partner_id=self.partner_id,
-                sec_key=sec_key,
-                timestamp=timestamp,
-                callback_url=self.call_back_url,
-                image_params=images_params,
-                partner_params=partner_params,
-                id_info_params=id_info_params,
-                upload_url=upload_url,
-            )
-            upload_response = WebApi.upload(upload_url, zip_stream)
-            if upload_response.status_code != 200:
-                raise ServerError(
-                    "Failed to post entity to {}, status={}, response={}".format(
-                        upload_url, prep_upload.status_code, prep_upload.json()
-                    )
-                )
+        prep_upload_json_resp = response_json(prep_upload)
+        return (
+            prep_upload_json_resp["upload_url"],
+            prep_upload_json_resp["smile_job_id"],
+        )
+
+    def __prep_upload_while_zipping(self, images_params, zip_kwargs):
+        # Only info.json needs the upload_url, so the images are read and
+        # compressed while the prep request is in flight on another thread.
+        from concurrent.futures import ThreadPoolExecutor
 
-            if options_params["return_job_status"]:
-                self.utilities = Utilities(
-                    self.partner_id, self.api_key, self.sid_server
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            prep_upload = executor.submit(
+                contextvars.copy_context().run,
+                self.__prep_upload,
+                zip_kwargs["partner_params"],
+                zip_kwargs["sec_key"],
+                zip_kwargs["timestamp"],
+            )
+            images_params = self.__preprocess_images(images_params)
+            with self.tracer.span("smile_id.zip", pipelined=True):
+                pending_zip = PendingZipFile(
+                    images_params, self.compresslevel, self.zip_executor
                 )
+            try:
+                upload_url, smile_job_id = prep_upload.result()
+            except BaseException:
+                pending_zip.discard()
+                raise
+        with self.tracer.span("smile_id.zip_finish") as span:
+            zip_stream = pending_zip.finish(
+                upload_url=upload_url, zero_copy=True, **zip_kwargs
+            )
+            span.set_attribute("zip.bytes", len(zip_stream))
+        return upload_url, smile_job_id, zip_stream
+
+    def __preprocess_images(self, images_params):
+        if self.image_preprocessor is None:
+            return images_params
+        with self.tracer.span("smile_id.preprocess_images") as span:
+            images_params, bytes_saved = self.image_preprocessor.process(
+                images_params, self.zip_executor
+            )
+            span.set_attribute("images.bytes_saved", bytes_saved)
+        return images_params
+
+    def resume_upload(self, handle):
+        with self.tracer.span(
+            "smile_id.resume_upload", partner_id=self.partner_id
+        ) as span:
+            span.set_attribute("upload.attempts", handle.attempts)
+            body = handle.rewind()
+            self.__upload(handle, body, [handle.size])
+            return self.__finish_job(handle, None, None)
+
+    def __upload(self, handle, body, upload_size):
+        handle.attempts += 1
+        try:
+            with self.tracer.span("smile_id.upload") as span:
+                upload_response = WebApi.upload(handle.upload_url, body, self.transport)
+                span.set_attribute("upload.bytes", upload_size[0])
+                span.set_attribute("http.status_code", upload_response.status_code)
+        except Exception as e:
+            raise UploadError(
+                "Failed to post entity to {}, error={!r}".format(handle.upload_url, e),
+                handle,
+            ) from e
+        if upload_response.status_code != 200:
+            raise UploadError(
+                "Failed to post entity to {}, status={}, response={}".format(
+                    handle.upload_url,
+                    upload_response.status_code,
+                    upload_response.text,
+                ),
+                handle,
+            )
+        handle.close()
+
+    def __finish_job(self, handle, sec_key, timestamp):
+        if handle.options_params["return_job_status"]:
+            with self.tracer.span("smile_id.poll_job_status"):
                 job_status = self.poll_job_status(
                     0,
-                    partner_params,
-                    options_params,
-                    sec_key_object["sec_key"],
-                    sec_key_object["timestamp"],
+                    handle.partner_params,
+                    handle.options_params,
+                    sec_key,
+                    timestamp,
                 )
-                job_status_response = job_status.json()
-                job_status_response["success"] = True
-                job_status_response["smile_job_id"] = smile_job_id
-                return job_status
+            job_status_response = response_json(job_status)
+            job_status_response["success"] = True
+            job_status_response["smile_job_id"] = handle.smile_job_id
+            return job_status
+        else:
+            return {"success": True, "smile_job_id": handle.smile_job_id}
+
+    def submit_jobs(
+        self, jobs, max_workers=8, preserve_order=False, use_validation_api=True
+    ):
+        # concurrent.futures is imported here to keep it off the import path of
+        # clients that never run bulk jobs.
+        from smile_id_core.bulk import run_bounded
+
+        return run_bounded(
+            lambda job: self.__submit_bulk_job(job, use_validation_api),
+            jobs,
+            max_workers,
+            preserve_order,
+        )
+
+    def __submit_bulk_job(self, job, use_validation_api):
+        return self.submit_job(*WebApi._job_arguments(job, use_validation_api))
+
+    @staticmethod
+    def _job_arguments(job, use_validation_api):
+        # The submit_job arguments of a Job, a dict or a tuple of arguments.
+        if isinstance(job, Job):
+            return (
+                job.partner_params,
+                job.images,
+                job.id_info,
+                job.options,
+                use_validation_api
+                if job.use_validation_api is None
+                else job.use_validation_api,
+            )
+        if isinstance(job, dict):
+            return (
+                job["partner_params"],
+                job.get("images_params"),
+                job.get("id_info_params"),
+                job.get("options_params"),
+                job.get("use_validation_api", use_validation_api),
+            )
+        return job
+
+    def validate_jobs(self, jobs, use_validation_api=True):
+        # Runs every check submit_job would, without sending anything, and
+        # reports the jobs that fail. The services list is fetched once, when
+        # the first job needs it.
+        services_index = []
+
+        def get_services_index():
+            if not services_index:
+                services_index.append(
+                    Utilities.get_services_index(self.url, self.transport)
+                )
+            return services_index[0]
+
+        return self._validate_jobs(jobs, use_validation_api, get_services_index)
+
+    def _validate_jobs(self, jobs, use_validation_api, get_services_index):
+        from smile_id_core.bulk import ValidationReport
+
+        report = ValidationReport()
+        for index, job in enumerate(jobs):
+            try:
+                id_check = self._validate_job(
+                    *WebApi._job_arguments(job, use_validation_api)
+                )
+            except (ValueError, KeyError, TypeError, OSError) as e:
+                report.add(index, e)
+                continue
+            if id_check is not None:
+                # Outside the try: a /services outage fails the whole call
+                # instead of being reported against every job.
+                services_index = get_services_index()
+                try:
+                    services_index.validate(*id_check)
+                except (ValueError, KeyError, TypeError) as e:
+                    report.add(index, e)
+                    continue
+            report.add(index)
+        return report
+
+    def _validate_job(
+        self,
+        partner_params,
+        images_params,
+        id_info_params,
+        options_params,
+        use_validation_api=True,
+    ):
+        # The local checks of one job. Returns the id_info and partner_params
+        # still to be checked against the services list, or None.
+        partner_params = partner_params_payload(partner_params)
+        if partner_params["job_type"] == 5:
+            if not id_info_params:
+                raise ValueError("Please ensure that you send through ID Information")
+        else:
+            options_params = options_params or _DEFAULT_OPTIONS
+            if isinstance(options_params, Options):
+                options_params = options_params.to_dict()
             else:
-                return {"success": True, "smile_job_id": smile_job_id}
+                self._validate_options(options_params)
+            self._validate_return_data(options_params)
+            images_payload(images_params)
+            if not id_info_params:
+                return None
+        id_info_params = model_payload(id_info_params)
+        if Utilities.validate_id_fields(id_info_params) and use_validation_api:
+            return id_info_params, partner_params
+        return None
 
     def __call_id_api(self, partner_params, id_info_params, use_validation_api):
-        id_api = IdApi(self.partner_id, self.api_key, self.sid_server)
-        return id_api.submit_job(partner_params, id_info_params, use_validation_api)
+        return self._get_id_api().submit_job(
+            partner_params, id_info_params, use_validation_api
+        )
+
+    def _get_id_api(self):
+        if self.id_api is None:
+            self.id_api = IdApi(
+                self.partner_id,
+                self.api_key,
+                self.sid_server,
+                self.transport,
+                self.tracer,
+            )
+            self.id_api.signature = self._get_signature()
+        return self.id_api
 
-    def __validate_options(self, options_params):
+    def _get_utilities(self):
+        if self.utilities is None:
+            self.utilities = Utilities(
+                self.partner_id,
+                self.api_key,
+                self.sid_server,
+                self.transport,
+                self.tracer,
+            )
+            self.utilities.signature = self._get_signature()
+        return self.utilities
+
+    def _validate_options(self, options_params):
         if not self.call_back_url and not options_params:
             raise ValueError(
                 "Please choose to either get your response via the callback or job status query"
@@ -148,17 +455,21 @@ class WebApi:
                 if key != "optional_callback" and not type(options_params[key]) == bool:
                     raise ValueError(key + " needs to be a boolean")
 
-    def __validate_return_data(self, options):
+    def _validate_return_data(self, options):
         if not self.call_back_url and not options["return_job_status"]:
             raise ValueError(
                 "Please choose to either get your response via the callback or job status query"
             )
 
-    def __get_sec_key(self):
-        sec_key_gen = Signature(self.partner_id, self.api_key)
-        return sec_key_gen.generate_sec_key()
+    def _get_signature(self):
+        if self.signature is None:
+            self.signature = Signature(self.partner_id, self.api_key)
+        return self.signature
+
+    def _get_sec_key(self):
+        return self._get_signature().generate_sec_key()
 
-    def __prepare_prep_upload_payload(self, partner_params, sec_key, timestamp):
+    def _prepare_prep_upload_payload(self, partner_params, sec_key, timestamp):
         return {
             "file_name": "selfie.zip",
             "timestamp": timestamp,
@@ -173,32 +484,27 @@ class WebApi:
         self, counter, partner_params, options_params, sec_key=None, timestamp=None
     ):
         if sec_key is None:
-            sec_key_object = self.__get_sec_key()
+            sec_key_object = self._get_sec_key()
             sec_key = sec_key_object["sec_key"]
             timestamp = sec_key_object["timestamp"]
 
-        counter = counter + 1
-        if counter < 4:
-            time.sleep(2)
-        else:
-            time.sleep(4)
+        while True:
+            counter = counter + 1
+            time.sleep(poll_interval(counter))
 
-        job_status = self.utilities.get_job_status(
-            partner_params, options_params, sec_key, timestamp
-        )
-        job_status_response = job_status.json()
-        if not job_status_response["job_complete"] and counter < 20:
-            self.poll_job_status(
-                counter, partner_params, options_params, sec_key, timestamp
+            job_status = self._get_utilities().get_job_status(
+                partner_params, options_params, sec_key, timestamp
             )
-
-        return job_status
+            job_status_response = response_json(job_status)
+            if job_status_response["job_complete"] or counter >= MAX_POLLS:
+                return job_status
 
     @staticmethod
-    def execute_http(url, payload):
-        data = json.dumps(payload)
-        resp = requests.post(
-            url=url,
+    def execute_http(url, payload, transport=None):
+        data = dumps(payload)
+        transport = transport or get_default_transport()
+        resp = transport.post(
+            url,
             data=data,
             headers={
                 "Accept": "application/json",
@@ -209,8 +515,15 @@ class WebApi:
         return resp
 
     @staticmethod
-    def upload(url, file):
-        resp = requests.put(
-            url=url, data=file, headers={"Content-type": "application/zip"}
+    def upload(url, file, transport=None):
+        transport = transport or get_default_transport()
+        resp = transport.put(
+            url, data=file, headers={"Content-type": "application/zip"}
         )
         return resp
+
+
+def _counted(chunks, size):
+    for chunk in chunks:
+        size[0] += len(chunk)
+        yield chunk
@@ -1,7 +1,49 @@
-from smile_id_core.Utilities import Utilities
-from smile_id_core.IdApi import IdApi
-from smile_id_core.WebApi import WebApi
-from smile_id_core.Signature import Signature
-from smile_id_core.ServerError import ServerError
+import importlib
+import sys
+import types
 
-__all__ = ["IdApi", "Signature", "Utilities", "WebApi", "ServerError"]
+__all__ = [
+    "IdApi",
+    "Signature",
+    "Utilities",
+    "WebApi",
+    "ServerError",
+    "JobPoller",
+    "JobStatusCache",
+    "AsyncIdApi",
+    "AsyncUtilities",
+    "AsyncWebApi",
+    "CallbackReceiver",
+    "UploadError",
+    "ImagePreprocessor",
+]
+
+# The public classes are imported on first access, so importing one of them
+# doesn't pay for requests, pycryptodome and aiohttp being loaded for the rest.
+_MODULES = {name: "smile_id_core." + name for name in __all__}
+_MODULES["UploadError"] = "smile_id_core.ServerError"
+
+
+class _LazyPackage(types.ModuleType):
+    def __getattr__(self, name):
+        module = _MODULES.get(name)
+        if module is None:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(self.__name__, name)
+            )
+        value = getattr(importlib.import_module(module), name)
+        super().__setattr__(name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # Each class lives in a submodule of the same name, and importing that
+        # submodule would otherwise replace the class on the package.
+        if name in _MODULES and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(__all__))
+
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -0,0 +1,166 @@
+import asyncio
+import collections
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from smile_id_core.json_codec import dumps, response_json
+
+__all__ = [
+    "JobResult",
+    "ValidationReport",
+    "run_bounded",
+    "run_bounded_async",
+    "write_jsonl",
+]
+
+
+class JobResult:
+    __slots__ = ("index", "job", "result", "error")
+
+    def __init__(self, index, job, result=None, error=None):
+        self.index = index
+        self.job = job
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return "JobResult(index={}, result={!r})".format(self.index, self.result)
+        return "JobResult(index={}, error={!r})".format(self.index, self.error)
+
+
+class ValidationReport:
+    # The jobs that failed validation, as (index, reason) pairs.
+    __slots__ = ("total", "failures")
+
+    def __init__(self):
+        self.total = 0
+        self.failures = []
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    @property
+    def failed_indexes(self):
+        return [index for index, _ in self.failures]
+
+    def add(self, index, error=None):
+        self.total += 1
+        if error is not None:
+            self.failures.append((index, _reason(error)))
+
+    def __repr__(self):
+        return "ValidationReport(total={}, failed={})".format(
+            self.total, len(self.failures)
+        )
+
+
+def _reason(error):
+    return "{}: {}".format(type(error).__name__, error)
+
+
+def _call(fn, index, job):
+    try:
+        return JobResult(index, job, result=fn(job))
+    except Exception as e:
+        return JobResult(index, job, error=e)
+
+
+def _next_done(in_flight, preserve_order):
+    if preserve_order:
+        return [in_flight.popleft()]
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in done:
+        in_flight.remove(future)
+    return done
+
+
+def run_bounded(fn, jobs, max_workers=8, preserve_order=False):
+    # Pulls from `jobs` only as workers free up, so an arbitrarily long (lazy)
+    # iterable never has more than `max_workers` jobs materialised at once.
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight = collections.deque()
+    try:
+        for index, job in enumerate(jobs):
+            in_flight.append(executor.submit(_call, fn, index, job))
+            if len(in_flight) < max_workers:
+                continue
+            for future in _next_done(in_flight, preserve_order):
+                yield future.result()
+        while in_flight:
+            for future in _next_done(in_flight, preserve_order):
+                yield future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+async def _call_async(fn, index, job):
+    try:
+        return JobResult(index, job, result=await fn(job))
+    except Exception as e:
+        return JobResult(index, job, error=e)
+
+
+async def _next_done_async(in_flight, preserve_order):
+    if preserve_order:
+        task = in_flight.popleft()
+        await asyncio.wait([task])
+        return [task]
+    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+    for task in done:
+        in_flight.remove(task)
+    return done
+
+
+async def run_bounded_async(fn, jobs, max_workers=8, preserve_order=False):
+    # run_bounded for a coroutine function `fn`: the jobs run as tasks on the
+    # running loop instead of in threads.
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    in_flight = collections.deque()
+    try:
+        for index, job in enumerate(jobs):
+            in_flight.append(asyncio.ensure_future(_call_async(fn, index, job)))
+            if len(in_flight) < max_workers:
+                continue
+            for task in await _next_done_async(in_flight, preserve_order):
+                yield task.result()
+        while in_flight:
+            for task in await _next_done_async(in_flight, preserve_order):
+                yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+
+def write_jsonl(results, sink):
+    # Writes every JobResult to the text file `sink` as one JSON line as soon as
+    # it is available, so a batch of any size runs in flat memory. Returns the
+    # number of jobs that succeeded and failed.
+    succeeded = failed = 0
+    for job_result in results:
+        record = {"index": job_result.index, "ok": job_result.ok}
+        if job_result.ok:
+            result = job_result.result
+            if hasattr(result, "status_code"):
+                result = response_json(result)
+            record["result"] = result
+            succeeded += 1
+        else:
+            record["error"] = _reason(job_result.error)
+            failed += 1
+        line = dumps(record)
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        sink.write(line + "\n")
+    return succeeded, failed
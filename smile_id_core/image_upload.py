@@ -1,7 +1,10 @@
-import json
 import zipfile
+import zlib
 import io
 import os
+import time
+
+from smile_id_core.json_codec import dumps
 
 
 class ApiVersion:
@@ -11,6 +14,22 @@ class ApiVersion:
 
 
 IMAGE_FILE_EXTENSIONS = (".png", ".jpg")
+CHUNK_SIZE = 64 * 1024
+# JPEG and PNG data is already compressed, deflating it again costs CPU for
+# next to no size reduction, so those entries are stored as they are.
+PRECOMPRESSED_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
+
+
+def is_image_buffer(image):
+    # In-memory image data (bytes, memoryview or a binary file object), sent
+    # with an explicit file_name instead of a path on disk.
+    return isinstance(image, (bytes, bytearray, memoryview)) or hasattr(image, "read")
+
+
+def entry_compress_type(header):
+    if bytes(header).startswith(PRECOMPRESSED_SIGNATURES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
 
 
 def generate_zip_file(
@@ -22,6 +41,9 @@ def generate_zip_file(
     id_info_params,
     sec_key,
     timestamp,
+    zero_copy=False,
+    compresslevel=None,
+    executor=None,
 ):
     info_json = prepare_info_json(
         partner_id,
@@ -34,16 +56,251 @@ def generate_zip_file(
         timestamp,
     )
     zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-        zip_file.writestr("info.json", data=json.dumps(info_json))
-        for image in image_params:
-            image_file_path = image["image"]
-            if image_file_path.lower().endswith(IMAGE_FILE_EXTENSIONS):
-                # TODO: do we really silently skip a file if its extension is different?
-                zip_file.write(image_file_path, os.path.basename(image_file_path))
+    with zipfile.ZipFile(
+        zip_buffer, "a", zipfile.ZIP_DEFLATED, False, compresslevel
+    ) as zip_file:
+        for _ in _write_entries(zip_file, info_json, image_params, executor=executor):
+            pass
+    if zero_copy:
+        return zip_buffer.getbuffer()
     return zip_buffer.getvalue()
 
 
+def iter_zip_file(
+    partner_id,
+    callback_url,
+    upload_url,
+    partner_params,
+    image_params,
+    id_info_params,
+    sec_key,
+    timestamp,
+    chunk_size=CHUNK_SIZE,
+    compresslevel=None,
+    executor=None,
+):
+    info_json = prepare_info_json(
+        partner_id,
+        callback_url,
+        upload_url,
+        partner_params,
+        image_params,
+        id_info_params,
+        sec_key,
+        timestamp,
+    )
+    stream = _ChunkStream()
+    with zipfile.ZipFile(
+        stream, "w", zipfile.ZIP_DEFLATED, False, compresslevel
+    ) as zip_file:
+        for _ in _write_entries(
+            zip_file, info_json, image_params, chunk_size, executor
+        ):
+            chunk = stream.drain()
+            if chunk:
+                yield chunk
+    chunk = stream.drain()
+    if chunk:
+        yield chunk
+
+
+class PendingZipFile:
+    # The image entries of a zip file, written before the upload_url that
+    # info.json needs is known. finish() appends info.json and closes the archive.
+    def __init__(self, image_params, compresslevel=None, executor=None):
+        self.image_params = image_params
+        self.__buffer = io.BytesIO()
+        self.__zip_file = zipfile.ZipFile(
+            self.__buffer, "w", zipfile.ZIP_DEFLATED, False, compresslevel
+        )
+        try:
+            for _ in _write_image_entries(
+                self.__zip_file, image_params, executor=executor
+            ):
+                pass
+        except BaseException:
+            self.discard()
+            raise
+
+    def finish(
+        self,
+        partner_id,
+        callback_url,
+        upload_url,
+        partner_params,
+        id_info_params,
+        sec_key,
+        timestamp,
+        zero_copy=False,
+    ):
+        info_json = prepare_info_json(
+            partner_id,
+            callback_url,
+            upload_url,
+            partner_params,
+            self.image_params,
+            id_info_params,
+            sec_key,
+            timestamp,
+        )
+        with self.__zip_file as zip_file:
+            zip_file.writestr("info.json", data=dumps(info_json))
+        if zero_copy:
+            return self.__buffer.getbuffer()
+        return self.__buffer.getvalue()
+
+    def discard(self):
+        self.__zip_file.close()
+        self.__buffer.close()
+
+
+class _ChunkStream:
+    # Write-only, unseekable sink for ZipFile. Without tell/seek, zipfile writes
+    # sizes in data descriptors after each entry instead of seeking back, so
+    # whatever has been written so far can be handed out and forgotten.
+    def __init__(self):
+        self.__chunks = []
+
+    def write(self, data):
+        self.__chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunk = b"".join(self.__chunks)
+        self.__chunks = []
+        return chunk
+
+
+def _write_entries(
+    zip_file, info_json, image_params, chunk_size=CHUNK_SIZE, executor=None
+):
+    zip_file.writestr("info.json", data=dumps(info_json))
+    yield
+    yield from _write_image_entries(zip_file, image_params, chunk_size, executor)
+
+
+def _write_image_entries(zip_file, image_params, chunk_size=CHUNK_SIZE, executor=None):
+    if executor is not None:
+        yield from _write_entries_parallel(zip_file, image_params, executor)
+        return
+    for image in image_params:
+        zip_info = _image_zip_info(image)
+        if zip_info is None:
+            # TODO: do we really silently skip a file if its extension is different?
+            continue
+        chunks = _image_chunks(image["image"], chunk_size)
+        chunk = next(chunks, b"")
+        zip_info.compress_type = entry_compress_type(chunk[:16])
+        # ZipFile.open keeps the level of a ZipInfo it is given, writestr sets
+        # it the same way. ZipInfo._compresslevel exists from CPython 3.7 on and
+        # is a property over compress_level from 3.13.
+        zip_info._compresslevel = zip_file.compresslevel
+        with zip_file.open(zip_info, "w") as destination:
+            while chunk:
+                destination.write(chunk)
+                yield
+                chunk = next(chunks, b"")
+        yield
+
+
+def _write_entries_parallel(zip_file, image_params, executor):
+    # Every entry is compressed and checksummed on the executor at once (zlib
+    # releases the GIL), then written in the original order, so the archive
+    # layout is the same as when the entries are written one at a time.
+    from concurrent.futures import ProcessPoolExecutor
+
+    entries = []
+    for image in image_params:
+        zip_info = _image_zip_info(image)
+        if zip_info is None:
+            continue
+        data = _image_data(image["image"])
+        if isinstance(executor, ProcessPoolExecutor):
+            data = bytes(data)
+        future = executor.submit(_compress_entry, data, zip_file.compresslevel)
+        entries.append((zip_info, future))
+    try:
+        for zip_info, future in entries:
+            compress_type, crc, file_size, payload = future.result()
+            zip_info.compress_type = compress_type
+            zip_info.file_size = file_size
+            _write_compressed(zip_file, zip_info, crc, file_size, payload)
+            yield
+    finally:
+        for _, future in entries:
+            future.cancel()
+
+
+def _compress_entry(data, compresslevel=None):
+    compress_type = entry_compress_type(data[:16])
+    crc = zlib.crc32(data)
+    if compress_type == zipfile.ZIP_STORED:
+        return compress_type, crc, len(data), data
+    if compresslevel is None:
+        compresslevel = zlib.Z_DEFAULT_COMPRESSION
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    return compress_type, crc, len(data), payload
+
+
+def _write_compressed(zip_file, zip_info, crc, file_size, payload):
+    # Written through ZipFile.open, so zipfile still does the headers, data
+    # descriptors and central directory, with the entry's compressor swapped
+    # for a passthrough and the CRC and size taken from the executor. Relies on
+    # _ZipWriteFile's _compressor, _crc and _file_size, checked against the
+    # zipfile module of CPython 3.7 to 3.13.
+    with zip_file.open(zip_info, "w") as destination:
+        destination._compressor = _Passthrough()
+        destination.write(payload)
+        destination._crc = crc
+        destination._file_size = file_size
+
+
+class _Passthrough:
+    # Compressor for a payload that is already compressed.
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b""
+
+
+def _image_zip_info(image):
+    source = image["image"]
+    if is_image_buffer(source):
+        zip_info = zipfile.ZipInfo(image["file_name"], time.localtime()[:6])
+        zip_info.external_attr = 0o600 << 16
+        return zip_info
+    if source.lower().endswith(IMAGE_FILE_EXTENSIONS):
+        return zipfile.ZipInfo.from_file(source, os.path.basename(source))
+    return None
+
+
+def _image_chunks(source, chunk_size):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # Slices of a memoryview share the caller's buffer, nothing is copied.
+        view = memoryview(source).cast("B")
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset : offset + chunk_size]
+    elif isinstance(source, str):
+        with open(source, "rb") as file:
+            yield from iter(lambda: file.read(chunk_size), b"")
+    else:
+        yield from iter(lambda: source.read(chunk_size), b"")
+
+
+def _image_data(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).cast("B")
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            return file.read()
+    return source.read()
+
+
 def prepare_info_json(
     partner_id,
     callback_url,
@@ -94,7 +351,13 @@ def prepare_image_payload(image_params):
     return [prepare_image_entry_dict(**image) for image in image_params]
 
 
-def prepare_image_entry_dict(image, image_type_id, **_):
+def prepare_image_entry_dict(image, image_type_id, file_name=None, **_):
+    if is_image_buffer(image):
+        return {
+            "image_type_id": image_type_id,
+            "image": "",
+            "file_name": file_name,
+        }
     if image.lower().endswith(IMAGE_FILE_EXTENSIONS):
         return {
             "image_type_id": image_type_id,
@@ -113,12 +376,18 @@ def validate_images(images_params):
         raise ValueError("Please ensure that you send through image details")
 
     if not isinstance(images_params, list):
-        raise ValueError(
-            "Please ensure that you send through image details as a list"
-        )
+        raise ValueError("Please ensure that you send through image details as a list")
 
     for image in images_params:
-        if image["image"].lower().endswith(IMAGE_FILE_EXTENSIONS):
+        if is_image_buffer(image["image"]):
+            file_name = image.get("file_name")
+            if not isinstance(file_name, str) or not file_name.lower().endswith(
+                IMAGE_FILE_EXTENSIONS
+            ):
+                raise ValueError(
+                    "Please ensure that you send through a file_name ending in .png or .jpg for in-memory images"
+                )
+        elif image["image"].lower().endswith(IMAGE_FILE_EXTENSIONS):
             if not os.path.exists(image["image"]):
                 raise FileNotFoundError(
                     "No such file or directory %s" % (image["image"])
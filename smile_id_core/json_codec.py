@@ -0,0 +1,77 @@
+import json
+import threading
+
+__all__ = [
+    "JsonCodec",
+    "OrjsonCodec",
+    "dumps",
+    "loads",
+    "response_json",
+    "get_default_codec",
+    "set_default_codec",
+]
+
+
+class JsonCodec:
+    # Standard library json. Subclass it, or use OrjsonCodec, and install it with
+    # set_default_codec to serialize payloads and parse responses faster.
+    def dumps(self, obj):
+        return json.dumps(obj)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError:
+            raise ImportError(
+                "OrjsonCodec requires orjson, install it with `pip install smile_id_core[orjson]`"
+            )
+        self.orjson = orjson
+
+    def dumps(self, obj):
+        return self.orjson.dumps(obj)
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+_default_codec = JsonCodec()
+_default_codec_lock = threading.Lock()
+
+
+def get_default_codec():
+    return _default_codec
+
+
+def set_default_codec(codec):
+    global _default_codec
+    with _default_codec_lock:
+        _default_codec = codec
+
+
+def dumps(obj):
+    return _default_codec.dumps(obj)
+
+
+def loads(data):
+    return _default_codec.loads(data)
+
+
+def response_json(response):
+    # Parses the body once. The parsed object is kept on the response and its
+    # json() returns that same object from then on, so later callers share it.
+    cached = vars(response).get("_smile_id_json")
+    if cached is not None:
+        return cached[0]
+    content = getattr(response, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        parsed = _default_codec.loads(content)
+    else:
+        parsed = response.json()
+    response._smile_id_json = (parsed,)
+    response.json = lambda **_: parsed
+    return parsed
@@ -0,0 +1,186 @@
+from smile_id_core.image_upload import validate_images
+from smile_id_core.Utilities import Utilities
+
+__all__ = [
+    "PartnerParams",
+    "IdInfo",
+    "Options",
+    "JobImage",
+    "Job",
+    "partner_params_payload",
+    "images_payload",
+    "model_payload",
+]
+
+
+class _Model:
+    # Validated once when it is built. The wire payload is built at the same
+    # time, and to_dict() returns a shallow copy of it, so a model can be shared
+    # between jobs.
+    __slots__ = ("_payload",)
+
+    def to_dict(self):
+        return dict(self._payload)
+
+    def __getattr__(self, name):
+        if name == "_payload":
+            raise AttributeError(name)
+        try:
+            return self._payload[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key):
+        return self._payload[key]
+
+    def keys(self):
+        return self._payload.keys()
+
+    def get(self, key, default=None):
+        return self._payload.get(key, default)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._payload == other._payload
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join("{}={!r}".format(k, v) for k, v in self._payload.items()),
+        )
+
+
+class PartnerParams(_Model):
+    __slots__ = ()
+
+    def __init__(self, user_id, job_id, job_type, **extra):
+        partner_params = dict(user_id=user_id, job_id=job_id, job_type=job_type)
+        partner_params.update(extra)
+        Utilities.validate_partner_params(partner_params)
+        self._payload = partner_params
+
+
+class IdInfo(_Model):
+    __slots__ = ()
+
+    def __init__(
+        self,
+        first_name=None,
+        middle_name=None,
+        last_name=None,
+        country=None,
+        id_type=None,
+        id_number=None,
+        dob=None,
+        phone_number=None,
+        entered=False,
+        **extra
+    ):
+        id_info = dict(
+            first_name=first_name,
+            middle_name=middle_name,
+            last_name=last_name,
+            country=country,
+            id_type=id_type,
+            id_number=id_number,
+            dob=dob,
+            phone_number=phone_number,
+            entered=entered,
+        )
+        id_info.update(extra)
+        Utilities.validate_id_fields(id_info)
+        self._payload = id_info
+
+
+class Options(_Model):
+    __slots__ = ()
+
+    def __init__(
+        self, return_job_status=True, return_history=False, return_images=False, **extra
+    ):
+        options = dict(
+            return_job_status=return_job_status,
+            return_history=return_history,
+            return_images=return_images,
+        )
+        options.update(extra)
+        for key in options:
+            if key != "optional_callback" and not type(options[key]) == bool:
+                raise ValueError(key + " needs to be a boolean")
+        self._payload = options
+
+
+class JobImage(_Model):
+    __slots__ = ()
+
+    def __init__(self, image, image_type_id, file_name=None):
+        image_params = {"image": image, "image_type_id": image_type_id}
+        if file_name is not None:
+            image_params["file_name"] = file_name
+        validate_images([image_params])
+        self._payload = image_params
+
+
+class Job:
+    # Everything needed to submit one job, validated up front. Dicts are turned
+    # into the models above. WebApi.submit_jobs accepts it in place of a dict.
+    # use_validation_api=None defers to the batch's use_validation_api.
+    __slots__ = (
+        "partner_params",
+        "images",
+        "id_info",
+        "options",
+        "use_validation_api",
+    )
+
+    def __init__(
+        self,
+        partner_params,
+        images=None,
+        id_info=None,
+        options=None,
+        use_validation_api=None,
+    ):
+        self.partner_params = _model(partner_params, PartnerParams)
+        if self.partner_params.job_type != 5 and not images:
+            raise ValueError("Please ensure that you send through image details")
+        self.images = tuple(_model(image, JobImage) for image in images or ())
+        self.id_info = _model(id_info, IdInfo)
+        self.options = _model(options, Options)
+        self.use_validation_api = use_validation_api
+
+    def __repr__(self):
+        return "Job(partner_params={!r}, images={})".format(
+            self.partner_params, len(self.images)
+        )
+
+
+def _model(value, model):
+    if value is None or isinstance(value, model):
+        return value
+    return model(**value)
+
+
+def model_payload(value):
+    # The wire payload of a model, anything else is returned as it is.
+    if isinstance(value, _Model):
+        return value.to_dict()
+    return value
+
+
+def partner_params_payload(partner_params):
+    if isinstance(partner_params, PartnerParams):
+        return partner_params.to_dict()
+    Utilities.validate_partner_params(partner_params)
+    return partner_params
+
+
+def images_payload(images_params):
+    if isinstance(images_params, (list, tuple)) and images_params:
+        validated = all(isinstance(image, JobImage) for image in images_params)
+        images_params = [model_payload(image) for image in images_params]
+        if validated:
+            return images_params
+    validate_images(images_params)
+    return images_params
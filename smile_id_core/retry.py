@@ -0,0 +1,198 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from smile_id_core.ServerError import ServerError
+
+__all__ = [
+    "RetryPolicy",
+    "RetryBudget",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "EndpointPolicies",
+    "RETRY_STATUSES",
+    "IDEMPOTENT_PHASES",
+    "phase_for",
+    "is_failure",
+    "is_replayable",
+]
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Phases that can be replayed safely. A prep_upload or id_verification POST that
+# timed out may already have created a job on the server, so those phases are
+# only retried when they have their own policy in `retry_policies`.
+IDEMPOTENT_PHASES = frozenset(("services", "job_status", "upload"))
+
+# Last path segment of each API endpoint, mapped to the phase names used by the
+# tracing spans. The presigned PUT is always the "upload" phase.
+_API_PHASES = {
+    "upload": "prep_upload",
+    "job_status": "job_status",
+    "id_verification": "id_verification",
+    "services": "services",
+}
+
+
+def phase_for(method, url):
+    if method == "PUT":
+        return "upload"
+    endpoint = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return _API_PHASES.get(endpoint, endpoint)
+
+
+def is_failure(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+def is_replayable(data):
+    # A streamed (generator) body is consumed by the first attempt.
+    return data is None or isinstance(data, (bytes, bytearray, memoryview, str))
+
+
+class CircuitOpenError(ServerError):
+    pass
+
+
+class RetryBudget:
+    # Every request deposits `ratio` of a token and every retry withdraws a whole
+    # one, so across all calls sharing the budget retries stay a bounded fraction
+    # of traffic and can't multiply the load on a struggling server.
+    def __init__(self, ratio=0.2, min_tokens=10, max_tokens=100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self.__lock = threading.Lock()
+
+    def deposit(self):
+        with self.__lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self.__lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff=0.5,
+        max_backoff=10,
+        jitter=True,
+        retry_statuses=RETRY_STATUSES,
+        budget=None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget
+
+    def record_request(self):
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def retry_delay(self, attempt):
+        # Seconds to wait before the next attempt, after `attempt` attempts have
+        # failed, or None when no retry is allowed.
+        if attempt >= self.max_attempts:
+            return None
+        if self.budget is not None and not self.budget.withdraw():
+            return None
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # After `failure_threshold` consecutive failures requests fail fast for
+    # `reset_timeout` seconds, then a single trial request decides whether the
+    # circuit closes again. A trial that never reports back (it was cancelled,
+    # or raised something that isn't a request error) is replaced by a new one
+    # after another `reset_timeout` seconds.
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.__opened_at = 0
+        self.__lock = threading.Lock()
+
+    def before_request(self, phase):
+        with self.__lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return
+            now = time.monotonic()
+            if now - self.__opened_at >= self.reset_timeout:
+                self.state = CircuitBreaker.HALF_OPEN
+                self.__opened_at = now
+                return
+        raise CircuitOpenError(
+            "Circuit for {} is open after {} failures, failing fast".format(
+                phase, self.failures
+            )
+        )
+
+    def record_success(self):
+        with self.__lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.__lock:
+            self.failures += 1
+            if (
+                self.state == CircuitBreaker.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.state = CircuitBreaker.OPEN
+                self.__opened_at = time.monotonic()
+
+
+class EndpointPolicies:
+    # Retry policy and circuit breaker for each phase. `retry_policies` maps a
+    # phase name to its own policy, other idempotent phases use `retry_policy`,
+    # and every phase gets its own breaker from `breaker_factory`.
+    def __init__(self, retry_policy=None, retry_policies=None, breaker_factory=None):
+        self.default_retry_policy = retry_policy
+        self.retry_policies = dict(retry_policies or {})
+        self.breaker_factory = breaker_factory
+        self.__breakers = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(
+            self.default_retry_policy is not None
+            or self.retry_policies
+            or self.breaker_factory is not None
+        )
+
+    def retry_policy(self, phase):
+        if phase in self.retry_policies:
+            return self.retry_policies[phase]
+        if phase in IDEMPOTENT_PHASES:
+            return self.default_retry_policy
+        return None
+
+    def breaker(self, phase):
+        if self.breaker_factory is None:
+            return None
+        breaker = self.__breakers.get(phase)
+        if breaker is None:
+            with self.__lock:
+                breaker = self.__breakers.setdefault(phase, self.breaker_factory())
+        return breaker
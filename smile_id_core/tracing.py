@@ -0,0 +1,33 @@
+import contextlib
+
+__all__ = ["Span", "Tracer", "OpenTelemetryTracer", "NOOP_TRACER"]
+
+
+class Span:
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = Span()
+
+
+class Tracer:
+    # Default tracer, every span is a no-op. Subclass it and override `span` to
+    # send phase timings to your own tracing or metrics system.
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        yield _NOOP_SPAN
+
+
+class OpenTelemetryTracer(Tracer):
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        attributes = {k: v for k, v in attributes.items() if v is not None}
+        with self.tracer.start_as_current_span(name, attributes=attributes) as span:
+            yield span
+
+
+NOOP_TRACER = Tracer()
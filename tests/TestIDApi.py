@@ -1,11 +1,16 @@
+import io
+import json
 import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
 from smile_id_core import Signature, IdApi, ServerError
+from smile_id_core.ServicesCache import ServicesCache
+from smile_id_core.bulk import write_jsonl
+from smile_id_core.models import IdInfo, Job, PartnerParams
 
 
 class TestIdApi(unittest.TestCase):
@@ -191,8 +196,8 @@ class TestIdApi(unittest.TestCase):
     def test_error_return_data(self):
         self.__reset_params()
         with self.assertRaises(ServerError) as ve:
-            with patch("requests.post") as mocked_post, patch(
-                "requests.get"
+            with patch("requests.Session.post") as mocked_post, patch(
+                "requests.Session.get"
             ) as mocked_get:
                 mocked_post.return_value.status_code = 400
                 mocked_post.return_value.ok = True
@@ -226,7 +231,7 @@ class TestIdApi(unittest.TestCase):
         self.__reset_params()
         timestamp = int(time.time())
         sec_timestamp = self.signatureObj.generate_sec_key(timestamp=timestamp)
-        with patch("requests.post") as mocked_post:
+        with patch("requests.Session.post") as mocked_post:
             mocked_post.return_value.status_code = 200
             mocked_post.return_value.ok = True
             mocked_post.return_value.text.return_value = self.get_id_response()
@@ -238,3 +243,51 @@ class TestIdApi(unittest.TestCase):
 
             self.assertEqual(response.status_code, 200)
             self.assertIsNotNone(response.json())
+
+    def test_submit_jobs(self):
+        self.__reset_params()
+        services = MagicMock(status_code=200)
+        services.json.return_value = {
+            "id_types": {
+                "NG": {"PASSPORT": ["country", "id_type", "id_number", "first_name"]}
+            }
+        }
+        bad_id_info = dict(self.id_info_params, country="ZW")
+        jobs = [
+            {"partner_params": self.partner_params, "id_params": self.id_info_params},
+            (self.partner_params, bad_id_info),
+            Job(
+                PartnerParams("user", "job", 5),
+                id_info=IdInfo(**self.id_info_params),
+            ),
+        ]
+
+        def post(url, data=None, **kwargs):
+            response = MagicMock(status_code=200)
+            response.json.return_value = {
+                "PartnerParams": json.loads(data)["partner_params"]
+            }
+            return response
+
+        with patch("requests.Session.get", return_value=services) as mocked_get, patch(
+            "requests.Session.post", side_effect=post
+        ) as mocked_post, patch(
+            "smile_id_core.Utilities.get_default_services_cache",
+            return_value=ServicesCache(),
+        ), patch.object(
+            self.id_api, "_get_sec_key", wraps=self.id_api._get_sec_key
+        ) as get_sec_key:
+            sink = io.StringIO()
+            counts = write_jsonl(
+                self.id_api.submit_jobs(jobs, max_workers=2, preserve_order=True),
+                sink,
+            )
+
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(mocked_get.call_count, 1)
+        self.assertEqual(mocked_post.call_count, 2)
+        self.assertEqual(get_sec_key.call_count, 1)
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual([r["index"] for r in records], [0, 1, 2])
+        self.assertEqual(records[1]["error"], "ValueError: country ZW is invalid")
+        self.assertEqual(records[2]["result"]["PartnerParams"]["user_id"], "user")
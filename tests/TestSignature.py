@@ -30,6 +30,11 @@ class TestSignature(unittest.TestCase):
         encrypted, hashed2 = sec_timestamp["sec_key"].split("|")
         self.assertEqual(hashed, hashed2)
 
+    def test_parsed_key_is_shared(self):
+        other = Signature(self.partner_id, self.public_key)
+        self.assertIs(other.public_key, self.signatureObj.public_key)
+        self.assertIs(other.cipher, self.signatureObj.cipher)
+
     # TODO: Confirm sec key tests
     def test_confirm_sec_key(self):
         pass
@@ -1,6 +1,7 @@
+import json
 import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from Crypto.Cipher import PKCS1_v1_5
@@ -225,7 +226,7 @@ class TestUtilities(unittest.TestCase):
 
     def test_id_info_params(self):
         self.__reset_params()
-        with patch("requests.get") as mocked_get:
+        with patch("requests.Session.get") as mocked_get:
             mocked_get.return_value.status_code = 200
             mocked_get.return_value.ok = True
             mocked_get.return_value.text.return_value = (
@@ -270,7 +271,7 @@ class TestUtilities(unittest.TestCase):
         self.__reset_params()
         timestamp = int(time.time())
         sec_timestamp = self.signatureObj.generate_sec_key(timestamp=timestamp)
-        with patch("requests.post") as mocked_post:
+        with patch("requests.Session.post") as mocked_post:
             mocked_post.return_value.status_code = 200
             mocked_post.return_value.ok = True
             mocked_post.return_value.text.return_value = self._get_job_status_response()
@@ -286,3 +287,57 @@ class TestUtilities(unittest.TestCase):
 
             self.assertEqual(job_status.status_code, 200)
             self.assertIsNotNone(job_status.json())
+
+    def __job_status_post(self, url, data=None, **kwargs):
+        response = MagicMock(status_code=200)
+        response.json.return_value = self._get_job_status_response()
+        return response
+
+    def test_get_job_statuses(self):
+        self.__reset_params()
+        partner_params_list = [
+            {"user_id": str(uuid4()), "job_id": str(uuid4()), "job_type": 1}
+            for _ in range(5)
+        ]
+        partner_params_list.insert(2, None)
+        with patch(
+            "requests.Session.post", side_effect=self.__job_status_post
+        ) as mocked_post, patch.object(
+            self.utilities, "_get_sec_key", wraps=self.utilities._get_sec_key
+        ) as mocked_sec_key:
+            results = list(
+                self.utilities.get_job_statuses(
+                    partner_params_list,
+                    self.options_params,
+                    max_workers=3,
+                    preserve_order=True,
+                )
+            )
+
+        self.assertEqual([r.index for r in results], list(range(6)))
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertTrue(all(r.ok for r in results if r.index != 2))
+        self.assertEqual(results[0].result.status_code, 200)
+        self.assertEqual(mocked_post.call_count, 5)
+        self.assertEqual(mocked_sec_key.call_count, 1)
+        sec_keys = {
+            json.loads(call.kwargs["data"])["sec_key"]
+            for call in mocked_post.call_args_list
+        }
+        self.assertEqual(len(sec_keys), 1)
+
+    def test_get_job_statuses_refreshes_sec_key(self):
+        self.__reset_params()
+        with patch(
+            "requests.Session.post", side_effect=self.__job_status_post
+        ), patch.object(
+            self.utilities, "_get_sec_key", wraps=self.utilities._get_sec_key
+        ) as mocked_sec_key:
+            results = list(
+                self.utilities.get_job_statuses(
+                    [self.partner_params] * 3, max_workers=1, sec_key_ttl=0
+                )
+            )
+
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(mocked_sec_key.call_count, 3)
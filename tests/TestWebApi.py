@@ -1,6 +1,10 @@
+import io
+import json
+import threading
 import time
 import unittest
-from unittest.mock import patch
+import zipfile
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from Crypto.Cipher import PKCS1_v1_5
@@ -54,6 +58,14 @@ class TestWebApi(unittest.TestCase):
             "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test",
         )
 
+    def test_sub_clients_are_reused(self):
+        utilities = self.web_api._get_utilities()
+        id_api = self.web_api._get_id_api()
+        self.assertIs(utilities, self.web_api._get_utilities())
+        self.assertIs(id_api, self.web_api._get_id_api())
+        self.assertIs(utilities.signature, self.web_api._get_signature())
+        self.assertIs(id_api.signature, self.web_api._get_signature())
+
     def test_no_image_params(self):
         self.__reset_params()
         with self.assertRaises(ValueError) as ve:
@@ -288,7 +300,7 @@ class TestWebApi(unittest.TestCase):
     def test_error_return_data(self):
         self.__reset_params()
         with self.assertRaises(ServerError) as ve:
-            with patch("requests.post") as mocked_post:
+            with patch("requests.Session.post") as mocked_post:
                 mocked_post.return_value.status_code = 400
                 mocked_post.return_value.ok = True
                 mocked_post.return_value.text.return_value = {
@@ -316,7 +328,9 @@ class TestWebApi(unittest.TestCase):
         self.__reset_params()
         timestamp = int(time.time())
         sec_timestamp = self.signatureObj.generate_sec_key(timestamp=timestamp)
-        with patch("requests.post") as mocked_post, patch("requests.put") as mocked_put:
+        with patch("requests.Session.post") as mocked_post, patch(
+            "requests.Session.put"
+        ) as mocked_put:
             mocked_post.return_value.status_code = 200
             mocked_post.return_value.ok = True
             mocked_post.return_value.text.return_value = self._get_job_status_response()
@@ -335,3 +349,140 @@ class TestWebApi(unittest.TestCase):
 
             self.assertEqual(response.status_code, 200)
             self.assertIsNotNone(response.json())
+
+    def test_poll_job_status_returns_final_response(self):
+        self.__reset_params()
+        pending = self._get_job_status_response()
+        pending["job_complete"] = False
+        responses = []
+        for body in [pending, pending, self._get_job_status_response()]:
+            response = MagicMock(status_code=200)
+            response.json.return_value = body
+            responses.append(response)
+        with patch("requests.Session.post") as mocked_post, patch("time.sleep"):
+            mocked_post.side_effect = responses
+
+            response = self.web_api.poll_job_status(
+                0, self.partner_params, self.options_params
+            )
+
+            self.assertEqual(mocked_post.call_count, 3)
+            self.assertTrue(response.json()["job_complete"])
+
+    def test_submit_job_parses_each_response_once(self):
+        self.__reset_params()
+        prep_upload = MagicMock(status_code=200)
+        prep_upload.json.return_value = {
+            "upload_url": "https://upload.example.com",
+            "smile_job_id": "0000000857",
+        }
+        job_status = MagicMock(status_code=200)
+        job_status.json.return_value = self._get_job_status_response()
+        prep_upload_json, job_status_json = prep_upload.json, job_status.json
+        with patch("requests.Session.post") as mocked_post, patch(
+            "requests.Session.put"
+        ) as mocked_put, patch("time.sleep"):
+            mocked_post.side_effect = [prep_upload, job_status]
+            mocked_put.return_value.status_code = 200
+
+            response = self.web_api.submit_job(
+                self.partner_params,
+                self.image_params,
+                self.id_info_params,
+                self.options_params,
+                False,
+            )
+
+        self.assertEqual(prep_upload_json.call_count, 1)
+        self.assertEqual(job_status_json.call_count, 1)
+        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.json()["smile_job_id"], "0000000857")
+
+    def test_submit_jobs(self):
+        self.__reset_params()
+        good_job = {
+            "partner_params": self.partner_params,
+            "images_params": self.image_params,
+            "id_info_params": self.id_info_params,
+            "options_params": {
+                "return_job_status": False,
+                "return_history": False,
+                "return_images": False,
+            },
+            "use_validation_api": False,
+        }
+        bad_job = dict(good_job, partner_params=None)
+        with patch("requests.Session.post") as mocked_post, patch(
+            "requests.Session.put"
+        ) as mocked_put:
+            mocked_post.return_value.status_code = 200
+            mocked_post.return_value.json.return_value = self._get_job_status_response()
+            mocked_put.return_value.status_code = 200
+
+            results = list(
+                self.web_api.submit_jobs(
+                    [good_job, bad_job, good_job], max_workers=2, preserve_order=True
+                )
+            )
+
+        self.assertEqual([r.index for r in results], [0, 1, 2])
+        self.assertEqual(results[0].result["smile_job_id"], "0000000857")
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertTrue(results[2].ok)
+
+    def test_pipeline_zip_builds_images_during_prep_upload(self):
+        self.__reset_params()
+        images_read = threading.Event()
+
+        class Image(io.BytesIO):
+            def read(self, *args):
+                images_read.set()
+                return super().read(*args)
+
+        def prep_upload(*args, **kwargs):
+            # The prep request only returns once the images are being read.
+            self.assertTrue(images_read.wait(5))
+            response = MagicMock(status_code=200)
+            response.json.return_value = {
+                "upload_url": "https://upload.example.com",
+                "smile_job_id": "0000000857",
+            }
+            return response
+
+        web_api = WebApi(
+            "001", "https://a_callback.com", self.public_key, 0, pipeline_zip=True
+        )
+        image_params = [
+            {"image_type_id": 0, "image": Image(b"selfie"), "file_name": "selfie.jpg"}
+        ]
+        options_params = {
+            "return_job_status": False,
+            "return_history": False,
+            "return_images": False,
+        }
+        with patch("requests.Session.post", side_effect=prep_upload), patch(
+            "requests.Session.put"
+        ) as mocked_put:
+            mocked_put.return_value.status_code = 200
+
+            response = web_api.submit_job(
+                self.partner_params, image_params, None, options_params, False
+            )
+
+        self.assertEqual(response, {"success": True, "smile_job_id": "0000000857"})
+        zip_file = zipfile.ZipFile(io.BytesIO(mocked_put.call_args.kwargs["data"]))
+        self.assertEqual(zip_file.namelist(), ["selfie.jpg", "info.json"])
+        self.assertEqual(zip_file.read("selfie.jpg"), b"selfie")
+        info_json = json.loads(zip_file.read("info.json"))
+        self.assertEqual(info_json["server_information"], "https://upload.example.com")
+
+    def test_pipeline_zip_cannot_stream(self):
+        with self.assertRaises(ValueError):
+            WebApi(
+                "001",
+                "https://a_callback.com",
+                self.public_key,
+                0,
+                stream_uploads=True,
+                pipeline_zip=True,
+            )
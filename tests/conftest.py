@@ -0,0 +1,49 @@
+import json
+import time
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from smile_id_core import Signature
+
+
+@pytest.fixture(scope="session")
+def api_key():
+    return RSA.generate(2048).publickey().export_key()
+
+
+@pytest.fixture()
+def partner_params():
+    return {"user_id": str(uuid4()), "job_id": str(uuid4()), "job_type": 1}
+
+
+@pytest.fixture()
+def job_status_body(api_key):
+    # Builds a freshly signed job_status response body.
+    def build(job_complete=True):
+        timestamp = int(time.time())
+        return {
+            "timestamp": timestamp,
+            "signature": Signature("001", api_key).generate_sec_key(timestamp)[
+                "sec_key"
+            ],
+            "job_complete": job_complete,
+            "job_success": job_complete,
+        }
+
+    return build
+
+
+@pytest.fixture()
+def json_response():
+    # Builds a requests-style response mock around a json body.
+    def build(body, status_code=200):
+        response = MagicMock(
+            status_code=status_code, ok=status_code < 400, text=json.dumps(body)
+        )
+        response.json.return_value = body
+        return response
+
+    return build
@@ -0,0 +1,309 @@
+import asyncio
+import gc
+import io
+import json
+import warnings
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from smile_id_core import AsyncIdApi, AsyncUtilities, AsyncWebApi, ServerError
+from smile_id_core.AsyncTransport import AsyncResponse, AsyncTransport
+from smile_id_core.ServicesCache import ServicesCache
+
+
+class FakeAsyncTransport:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    async def __respond(self, method, url, data):
+        self.calls.append((method, url, data))
+        status, body = self.responses[(method, url.rsplit("/", 1)[-1])]
+        if callable(body):
+            body = body()
+        return AsyncResponse(status, "OK", {}, json.dumps(body).encode("utf-8"))
+
+    async def get(self, url, headers=None):
+        return await self.__respond("GET", url, None)
+
+    async def post(self, url, data=None, headers=None):
+        return await self.__respond("POST", url, data)
+
+    async def put(self, url, data=None, headers=None):
+        return await self.__respond("PUT", url, data)
+
+
+def test_get_job_status(api_key, partner_params, job_status_body):
+    transport = FakeAsyncTransport(
+        {("POST", "job_status"): (200, lambda: job_status_body())}
+    )
+    utilities = AsyncUtilities("001", api_key, 0, transport)
+
+    response = asyncio.run(utilities.get_job_status(partner_params, None, None, None))
+
+    assert response.status_code == 200
+    assert response.json()["job_complete"] is True
+    payload = json.loads(transport.calls[0][2])
+    assert payload["user_id"] == partner_params["user_id"]
+    assert payload["history"] is False
+
+
+def test_get_job_statuses(api_key, job_status_body):
+    transport = FakeAsyncTransport(
+        {("POST", "job_status"): (200, lambda: job_status_body())}
+    )
+    utilities = AsyncUtilities("001", api_key, 0, transport)
+    partner_params_list = [
+        {"user_id": "user", "job_id": str(job_id), "job_type": 1} for job_id in range(5)
+    ]
+    partner_params_list.insert(2, None)
+
+    async def run():
+        results = utilities.get_job_statuses(
+            partner_params_list, max_workers=2, preserve_order=True
+        )
+        return [result async for result in results]
+
+    with patch.object(
+        utilities, "_get_sec_key", wraps=utilities._get_sec_key
+    ) as mocked_sec_key:
+        results = asyncio.run(run())
+
+    assert [r.index for r in results] == list(range(6))
+    assert isinstance(results[2].error, ValueError)
+    assert all(r.result.json()["job_complete"] for r in results if r.index != 2)
+    assert len(transport.calls) == 5
+    assert mocked_sec_key.call_count == 1
+
+
+def test_id_api_submit_job_error(api_key, partner_params):
+    partner_params["job_type"] = 5
+    transport = FakeAsyncTransport(
+        {("POST", "id_verification"): (400, {"code": "2204", "error": "unauthorized"})}
+    )
+    id_api = AsyncIdApi("001", api_key, 0, transport)
+    id_info_params = {
+        "country": "NG",
+        "id_type": "BVN",
+        "id_number": "00000000000",
+        "entered": True,
+    }
+
+    with pytest.raises(ServerError) as exc_info:
+        asyncio.run(id_api.submit_job(partner_params, id_info_params, False))
+    assert "status=400" in exc_info.value.args[0]
+
+
+def test_id_api_submit_jobs(api_key):
+    transport = FakeAsyncTransport(
+        {
+            ("GET", "services"): (
+                200,
+                {"id_types": {"NG": {"BVN": ["country", "id_type", "id_number"]}}},
+            ),
+            ("POST", "id_verification"): (200, {"ResultCode": "1012"}),
+        }
+    )
+    id_api = AsyncIdApi("001", api_key, 0, transport)
+    id_params = {
+        "country": "NG",
+        "id_type": "BVN",
+        "id_number": "00000000000",
+        "entered": True,
+    }
+    jobs = [
+        ({"user_id": "user", "job_id": str(job_id), "job_type": 5}, id_params)
+        for job_id in range(4)
+    ]
+    jobs.insert(1, (jobs[0][0], dict(id_params, country="ZW")))
+
+    async def run():
+        results = id_api.submit_jobs(jobs, max_workers=3, preserve_order=True)
+        return [result async for result in results]
+
+    with patch(
+        "smile_id_core.AsyncUtilities.get_default_services_cache",
+        return_value=ServicesCache(),
+    ), patch.object(id_api, "_get_sec_key", wraps=id_api._get_sec_key) as sec_key:
+        results = asyncio.run(run())
+
+    assert [r.ok for r in results] == [True, False, True, True, True]
+    assert results[1].error.args[0] == "country ZW is invalid"
+    assert [call[0] for call in transport.calls].count("GET") == 1
+    assert sec_key.call_count == 1
+
+
+def test_web_api_submit_job_polls_until_complete(
+    api_key, partner_params, job_status_body
+):
+    statuses = iter([False, False, True])
+    transport = FakeAsyncTransport(
+        {
+            ("POST", "upload"): (
+                200,
+                {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"},
+            ),
+            ("PUT", "zip"): (200, {}),
+            ("POST", "job_status"): (
+                200,
+                lambda: job_status_body(next(statuses)),
+            ),
+        }
+    )
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, transport)
+    image_params = [{"image_type_id": "2", "image": "base6image"}]
+    options_params = {
+        "return_job_status": True,
+        "return_history": False,
+        "return_images": False,
+    }
+
+    async def no_sleep(_):
+        pass
+
+    with patch("asyncio.sleep", no_sleep):
+        response = asyncio.run(
+            web_api.submit_job(
+                partner_params, image_params, None, options_params, False
+            )
+        )
+
+    assert response.json()["job_complete"] is True
+    assert response.json()["success"] is True
+    assert response.json()["smile_job_id"] == "1"
+    assert [call[0] for call in transport.calls] == [
+        "POST",
+        "PUT",
+        "POST",
+        "POST",
+        "POST",
+    ]
+
+
+def test_web_api_submit_jobs(api_key, partner_params):
+    transport = FakeAsyncTransport(
+        {
+            ("POST", "upload"): (
+                200,
+                {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"},
+            ),
+            ("PUT", "zip"): (200, {}),
+        }
+    )
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, transport)
+    options_params = {
+        "return_job_status": False,
+        "return_history": False,
+        "return_images": False,
+    }
+    jobs = [
+        {
+            "partner_params": partner_params,
+            "images_params": [{"image_type_id": "2", "image": "base6image"}],
+            "options_params": options_params,
+            "use_validation_api": False,
+        },
+        {"partner_params": partner_params, "images_params": []},
+    ]
+
+    async def run():
+        return [result async for result in web_api.submit_jobs(jobs)]
+
+    results = sorted(asyncio.run(run()), key=lambda r: r.index)
+    assert results[0].result == {"success": True, "smile_job_id": "1"}
+    assert isinstance(results[1].error, ValueError)
+
+
+def test_web_api_submit_job_without_job_status(api_key, partner_params):
+    transport = FakeAsyncTransport(
+        {
+            ("POST", "upload"): (
+                200,
+                {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"},
+            ),
+            ("PUT", "zip"): (200, {}),
+        }
+    )
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, transport)
+    image_params = [{"image_type_id": "2", "image": "base6image"}]
+    options_params = {
+        "return_job_status": False,
+        "return_history": False,
+        "return_images": False,
+    }
+
+    response = asyncio.run(
+        web_api.submit_job(partner_params, image_params, None, options_params, False)
+    )
+
+    assert response == {"success": True, "smile_job_id": "1"}
+
+
+def test_web_api_pipeline_zip(api_key, partner_params):
+    transport = FakeAsyncTransport(
+        {
+            ("POST", "upload"): (
+                200,
+                {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"},
+            ),
+            ("PUT", "zip"): (200, {}),
+        }
+    )
+    web_api = AsyncWebApi(
+        "001", "https://a_callback.com", api_key, 0, transport, pipeline_zip=True
+    )
+    image_params = [{"image_type_id": 0, "image": b"selfie", "file_name": "selfie.jpg"}]
+    options_params = {
+        "return_job_status": False,
+        "return_history": False,
+        "return_images": False,
+    }
+
+    response = asyncio.run(
+        web_api.submit_job(partner_params, image_params, None, options_params, False)
+    )
+
+    assert response == {"success": True, "smile_job_id": "1"}
+    zip_file = zipfile.ZipFile(io.BytesIO(transport.calls[-1][2]))
+    assert zip_file.namelist() == ["selfie.jpg", "info.json"]
+
+
+def test_web_api_pipeline_zip_prep_upload_error(api_key, partner_params):
+    transport = FakeAsyncTransport({("POST", "upload"): (400, {"error": "bad"})})
+    web_api = AsyncWebApi(
+        "001", "https://a_callback.com", api_key, 0, transport, pipeline_zip=True
+    )
+    image_params = [{"image_type_id": 0, "image": b"selfie", "file_name": "selfie.jpg"}]
+
+    with pytest.raises(ServerError):
+        asyncio.run(web_api.submit_job(partner_params, image_params, None, None, False))
+
+
+def test_sessions_are_closed_when_each_loop_shuts_down():
+    transport = AsyncTransport()
+
+    async def fetch():
+        app = web.Application()
+        app.router.add_get("/services", lambda request: web.json_response({}))
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            response = await transport.get("http://127.0.0.1:{}/services".format(port))
+            return response.status_code
+        finally:
+            await runner.cleanup()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert asyncio.run(fetch()) == 200
+        assert asyncio.run(fetch()) == 200
+        transport = None
+        gc.collect()
+
+    assert not [w for w in caught if "Unclosed" in str(w.message)]
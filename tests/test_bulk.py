@@ -0,0 +1,124 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+from smile_id_core.bulk import JobResult, run_bounded, run_bounded_async, write_jsonl
+
+
+def test_results_and_errors_are_collected():
+    def fn(job):
+        if job == 3:
+            raise ValueError("bad job")
+        return job * 2
+
+    results = sorted(run_bounded(fn, range(6), max_workers=2), key=lambda r: r.index)
+
+    assert [r.result for r in results if r.ok] == [0, 2, 4, 8, 10]
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1
+    assert failed[0].index == 3
+    assert isinstance(failed[0].error, ValueError)
+
+
+def test_preserve_order():
+    def fn(job):
+        time.sleep(0.01 * (5 - job))
+        return job
+
+    results = list(run_bounded(fn, range(5), max_workers=5, preserve_order=True))
+
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.result for r in results] == [0, 1, 2, 3, 4]
+
+
+def test_concurrency_is_bounded_and_input_is_lazy():
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    pulled = [0]
+
+    def jobs():
+        for i in range(20):
+            pulled[0] += 1
+            yield i
+
+    def fn(job):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return job
+
+    results = run_bounded(fn, jobs(), max_workers=3)
+    first = next(results)
+    assert isinstance(first, JobResult)
+    assert pulled[0] <= 3
+    assert len(list(results)) == 19
+    assert peak[0] <= 3
+
+
+def test_async_concurrency_is_bounded_and_input_is_lazy():
+    running = [0]
+    peak = [0]
+    pulled = [0]
+
+    def jobs():
+        for i in range(20):
+            pulled[0] += 1
+            yield i
+
+    async def fn(job):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.001 * (job % 3))
+        running[0] -= 1
+        if job == 7:
+            raise ValueError("bad job")
+        return job * 2
+
+    async def run():
+        results = run_bounded_async(fn, jobs(), max_workers=3)
+        first = await results.__anext__()
+        assert isinstance(first, JobResult)
+        assert pulled[0] <= 3
+        return [first] + [result async for result in results]
+
+    results = sorted(asyncio.run(run()), key=lambda r: r.index)
+    assert [r.result for r in results if r.ok] == [i * 2 for i in range(20) if i != 7]
+    assert isinstance(results[7].error, ValueError)
+    assert peak[0] <= 3
+
+
+def test_async_preserve_order():
+    async def fn(job):
+        await asyncio.sleep(0.01 * (5 - job))
+        return job
+
+    async def run():
+        results = run_bounded_async(fn, range(5), max_workers=5, preserve_order=True)
+        return [result.index async for result in results]
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_write_jsonl():
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"ResultCode": "1012"}
+    results = [
+        JobResult(0, "job", result=response),
+        JobResult(1, "job", error=ValueError("bad job")),
+        JobResult(2, "job", result={"success": True}),
+    ]
+    sink = io.StringIO()
+
+    assert write_jsonl(iter(results), sink) == (2, 1)
+    assert [json.loads(line) for line in sink.getvalue().splitlines()] == [
+        {"index": 0, "ok": True, "result": {"ResultCode": "1012"}},
+        {"index": 1, "ok": False, "error": "ValueError: bad job"},
+        {"index": 2, "ok": True, "result": {"success": True}},
+    ]
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from smile_id_core import AsyncWebApi, CallbackReceiver, Signature
+from tests.test_async_clients import FakeAsyncTransport
+
+OPTIONS = {"return_job_status": True, "return_history": False, "return_images": False}
+
+
+def callback_body(api_key, partner_params, smile_job_id="0000000001"):
+    timestamp = int(time.time())
+    return {
+        "SmileJobID": smile_job_id,
+        "PartnerParams": partner_params,
+        "ResultCode": "1012",
+        "timestamp": timestamp,
+        "signature": Signature("001", api_key).generate_sec_key(timestamp)["sec_key"],
+    }
+
+
+async def post(url, body):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, data=body) as response:
+            return response.status
+
+
+def test_callback_resolves_expected_job(api_key, partner_params):
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            by_smile_job_id = receiver.expect(smile_job_id="0000000001")
+            by_partner_params = receiver.expect(
+                user_id=partner_params["user_id"], job_id=partner_params["job_id"]
+            )
+            body = json.dumps(callback_body(api_key, partner_params))
+            assert await post(receiver.url, body) == 200
+            await asyncio.wait_for(by_smile_job_id, 1)
+            assert not by_partner_params.done()
+            body = json.dumps(callback_body(api_key, partner_params, "2"))
+            assert await post(receiver.url, body) == 200
+            await asyncio.wait_for(by_partner_params, 1)
+            return receiver.pending()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_early_callback_is_kept(api_key, partner_params):
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            body = json.dumps(callback_body(api_key, partner_params))
+            assert await post(receiver.url, body) == 200
+            future = receiver.expect(smile_job_id="0000000001")
+            await asyncio.wait_for(future, 1)
+            return receiver.pending()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_rejects_bad_callbacks(api_key, partner_params):
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            future = receiver.expect(smile_job_id="0000000001")
+            statuses = [
+                await post(receiver.url, "not json"),
+                await post(receiver.url, json.dumps(["0000000001"])),
+                await post(receiver.url, json.dumps({"ResultCode": "1012"})),
+            ]
+            return statuses, future.done()
+
+    assert asyncio.run(run()) == ([400, 400, 400], False)
+
+
+def test_expect_needs_a_key():
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            receiver.expect(user_id="user_id")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def web_api_transport(job_status_body, on_upload=None):
+    def upload():
+        if on_upload is not None:
+            on_upload()
+        return {}
+
+    return FakeAsyncTransport(
+        {
+            ("POST", "upload"): (
+                200,
+                {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"},
+            ),
+            ("PUT", "zip"): (200, upload),
+            ("POST", "job_status"): (200, job_status_body),
+        }
+    )
+
+
+def test_web_api_waits_for_callback(api_key, partner_params, job_status_body):
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            body = json.dumps(callback_body(api_key, partner_params, "1"))
+            transport = web_api_transport(
+                job_status_body,
+                lambda: asyncio.get_running_loop().create_task(
+                    post(receiver.url, body)
+                ),
+            )
+            web_api = AsyncWebApi(
+                "001",
+                receiver.url,
+                api_key,
+                0,
+                transport,
+                callback_receiver=receiver,
+            )
+            image_params = [{"image_type_id": "2", "image": "base6image"}]
+            response = await web_api.submit_job(
+                partner_params, image_params, None, OPTIONS, False
+            )
+            return response, transport.calls, receiver.pending()
+
+    response, calls, pending = asyncio.run(run())
+    # the callback body is never returned, the job status is queried instead
+    assert response.json()["job_complete"] is True
+    assert "ResultCode" not in response.json()
+    assert response.json()["smile_job_id"] == "1"
+    assert [call[0] for call in calls] == ["POST", "PUT", "POST"]
+    assert pending == 0
+
+
+def test_web_api_polls_when_callback_is_early(api_key, partner_params, job_status_body):
+    statuses = iter([False, True])
+
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            body = json.dumps(callback_body(api_key, partner_params, "1"))
+            transport = web_api_transport(
+                lambda: job_status_body(next(statuses)),
+                lambda: asyncio.get_running_loop().create_task(
+                    post(receiver.url, body)
+                ),
+            )
+            web_api = AsyncWebApi(
+                "001",
+                receiver.url,
+                api_key,
+                0,
+                transport,
+                callback_receiver=receiver,
+            )
+            image_params = [{"image_type_id": "2", "image": "base6image"}]
+            with patch("smile_id_core.AsyncWebApi.poll_interval", return_value=0):
+                response = await web_api.submit_job(
+                    partner_params, image_params, None, OPTIONS, False
+                )
+            return response, transport.calls
+
+    response, calls = asyncio.run(run())
+    assert response.json()["job_complete"] is True
+    assert [call[0] for call in calls] == ["POST", "PUT", "POST", "POST"]
+
+
+def test_web_api_falls_back_to_polling(api_key, partner_params, job_status_body):
+    async def run():
+        async with CallbackReceiver(port=0) as receiver:
+            transport = web_api_transport(job_status_body)
+            web_api = AsyncWebApi(
+                "001",
+                receiver.url,
+                api_key,
+                0,
+                transport,
+                callback_receiver=receiver,
+                callback_timeout=0.01,
+            )
+            image_params = [{"image_type_id": "2", "image": "base6image"}]
+            with patch("smile_id_core.AsyncWebApi.poll_interval", return_value=0):
+                response = await web_api.submit_job(
+                    partner_params, image_params, None, OPTIONS, False
+                )
+            return response, transport.calls, receiver.pending()
+
+    response, calls, pending = asyncio.run(run())
+    assert response.json()["job_complete"] is True
+    assert [call[0] for call in calls] == ["POST", "PUT", "POST"]
+    assert pending == 0
@@ -0,0 +1,206 @@
+import io
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from smile_id_core.image_upload import generate_zip_file
+from tests.test_tracing import RecordingTracer
+
+Image = pytest.importorskip("PIL.Image")
+
+from smile_id_core import ImagePreprocessor, WebApi  # noqa: E402
+
+
+def make_image(size, image_format="JPEG"):
+    output = io.BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(output, image_format)
+    return output.getvalue()
+
+
+def test_large_image_is_downscaled():
+    preprocessor = ImagePreprocessor(max_dimension=400, max_bytes=10 ** 9)
+    image_params = [
+        {
+            "image": make_image((1600, 1200)),
+            "image_type_id": 0,
+            "file_name": "selfie.jpg",
+        }
+    ]
+
+    processed, bytes_saved = preprocessor.process(image_params)
+
+    image = processed[0]
+    assert image["file_name"] == "selfie.jpg"
+    assert Image.open(io.BytesIO(image["image"])).size == (400, 300)
+    assert bytes_saved == len(image_params[0]["image"]) - len(image["image"])
+    assert bytes_saved > 0
+    assert preprocessor.bytes_saved == bytes_saved
+
+
+def test_small_image_is_left_alone(tmp_path):
+    path = tmp_path / "id_front.png"
+    path.write_bytes(make_image((200, 100), "PNG"))
+    image_params = [
+        {"image": str(path), "image_type_id": 1},
+        {"image": "base64image", "image_type_id": 2},
+    ]
+
+    processed, bytes_saved = ImagePreprocessor().process(image_params)
+
+    assert processed == image_params
+    assert bytes_saved == 0
+
+
+def test_streams_are_rewound_or_replaced():
+    data = make_image((200, 100))
+
+    class Stream(io.RawIOBase):
+        # a pipe-like stream that can only be read once
+        def __init__(self):
+            self.buffer = io.BytesIO(data)
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            return self.buffer.readinto(b)
+
+    seekable = io.BytesIO(data)
+    image_params = [
+        {"image": seekable, "image_type_id": 1, "file_name": "a.jpg"},
+        {"image": Stream(), "image_type_id": 1, "file_name": "b.jpg"},
+    ]
+
+    processed, _ = ImagePreprocessor().process(image_params)
+
+    assert processed[0]["image"] is seekable
+    assert seekable.read() == data
+    assert processed[1]["image"] == data
+    assert processed[1]["file_name"] == "b.jpg"
+
+
+def test_stream_is_rewound_to_where_it_started():
+    data = make_image((200, 100))
+    stream = io.BytesIO(b"HEADERJUNK" + data)
+    stream.read(10)
+    image_params = [{"image": stream, "image_type_id": 1, "file_name": "a.jpg"}]
+
+    processed, _ = ImagePreprocessor().process(image_params)
+    assert stream.tell() == 10
+    zip_stream = generate_zip_file(
+        partner_id="001",
+        callback_url="",
+        upload_url="",
+        partner_params={"user_id": "user", "job_id": "job", "job_type": 1},
+        image_params=processed,
+        id_info_params={},
+        sec_key="key",
+        timestamp=0,
+    )
+
+    assert zipfile.ZipFile(io.BytesIO(zip_stream)).read("a.jpg") == data
+
+
+def test_limits_per_image_type(tmp_path):
+    path = tmp_path / "id_front.png"
+    path.write_bytes(make_image((800, 600), "PNG"))
+    preprocessor = ImagePreprocessor(
+        max_dimension=200, image_types={1: {"max_dimension": 1000}}
+    )
+    image_params = [
+        {"image": str(path), "image_type_id": 0},
+        {"image": str(path), "image_type_id": 1},
+    ]
+
+    processed, _ = preprocessor.process(image_params)
+
+    selfie, id_card = processed
+    assert selfie["file_name"] == "id_front.jpg"
+    assert Image.open(io.BytesIO(selfie["image"])).size == (200, 150)
+    # too many bytes as a PNG, so it is re-encoded but keeps its resolution
+    assert Image.open(io.BytesIO(id_card["image"])).size == (800, 600)
+
+
+def test_processed_images_can_be_zipped():
+    image_params = [
+        {
+            "image": make_image((1600, 1200)),
+            "image_type_id": 0,
+            "file_name": "selfie.png",
+        }
+    ]
+    processed, _ = ImagePreprocessor(max_dimension=400).process(image_params)
+
+    zip_file = zipfile.ZipFile(
+        io.BytesIO(
+            generate_zip_file(
+                partner_id="partner_id",
+                callback_url="callback_url",
+                upload_url="upload_url",
+                partner_params={},
+                image_params=processed,
+                id_info_params={},
+                sec_key="sec_key",
+                timestamp="timestamp",
+            )
+        )
+    )
+
+    assert zip_file.namelist() == ["info.json", "selfie.jpg"]
+    assert Image.open(zip_file.open("selfie.jpg")).size == (400, 300)
+
+
+def test_unreadable_image_is_sent_as_is():
+    image_params = [
+        {"image": b"\xff\xd8\xff" * 10 ** 6, "image_type_id": 0, "file_name": "a.jpg"}
+    ]
+
+    processed, bytes_saved = ImagePreprocessor().process(image_params)
+
+    assert processed == image_params
+    assert bytes_saved == 0
+
+
+@pytest.mark.parametrize("pipeline_zip", [False, True])
+def test_web_api_uploads_processed_images(pipeline_zip):
+    tracer = RecordingTracer()
+    web_api = WebApi(
+        "001",
+        "https://a_callback.com",
+        RSA.generate(2048).publickey().export_key(),
+        0,
+        tracer=tracer,
+        pipeline_zip=pipeline_zip,
+        image_preprocessor=ImagePreprocessor(max_dimension=400),
+    )
+    image_params = [
+        {
+            "image": make_image((1600, 1200)),
+            "image_type_id": 0,
+            "file_name": "selfie.png",
+        }
+    ]
+    options_params = {
+        "return_job_status": False,
+        "return_history": False,
+        "return_images": False,
+    }
+    prep_upload = MagicMock(status_code=200)
+    prep_upload.json.return_value = {
+        "upload_url": "https://upload.example.com",
+        "smile_job_id": "0000000857",
+    }
+    partner_params = {"user_id": "user", "job_id": "job", "job_type": 1}
+
+    with patch("requests.Session.post", return_value=prep_upload), patch(
+        "requests.Session.put"
+    ) as mocked_put:
+        mocked_put.return_value.status_code = 200
+        web_api.submit_job(partner_params, image_params, None, options_params, False)
+
+    zip_file = zipfile.ZipFile(io.BytesIO(mocked_put.call_args.kwargs["data"]))
+    assert "selfie.jpg" in zip_file.namelist()
+    assert Image.open(zip_file.open("selfie.jpg")).size == (400, 300)
+    assert tracer.get("smile_id.preprocess_images").attributes["images.bytes_saved"] > 0
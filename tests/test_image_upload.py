@@ -2,15 +2,18 @@ import io
 import os
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import pytest
 
 from smile_id_core.image_upload import (
+    PendingZipFile,
     prepare_image_entry_dict,
     prepare_info_json,
     generate_zip_file,
+    iter_zip_file,
     prepare_image_payload,
-    validate_images
+    validate_images,
 )
 
 
@@ -109,3 +112,183 @@ def test_validate_images__error_file_not_found():
         validate_images(image_params)
 
 
+def _zip_kwargs(image_params):
+    return dict(
+        partner_id="partner_id",
+        callback_url="callback_url",
+        upload_url="upload_url",
+        partner_params="partner_params",
+        image_params=image_params,
+        id_info_params="id_info_params",
+        sec_key="sec_key",
+        timestamp="timestamp",
+    )
+
+
+def test_generate_zip_file_zero_copy(temp_image_file):
+    image_params = [{"image": temp_image_file, "image_type_id": 5}]
+
+    zip_view = generate_zip_file(zero_copy=True, **_zip_kwargs(image_params))
+
+    assert isinstance(zip_view, memoryview)
+    zf = zipfile.ZipFile(io.BytesIO(zip_view))
+    assert zf.namelist() == ["info.json", os.path.basename(temp_image_file)]
+
+
+def test_iter_zip_file_streams_chunks():
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as image_file:
+        image_file.write(os.urandom(200 * 1024))
+    try:
+        image_params = [{"image": image_file.name, "image_type_id": 5}]
+
+        chunks = list(iter_zip_file(chunk_size=16 * 1024, **_zip_kwargs(image_params)))
+
+        assert len(chunks) > 1
+        zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert zf.testzip() is None
+        with open(image_file.name, "rb") as f:
+            assert zf.read(os.path.basename(image_file.name)) == f.read()
+    finally:
+        os.remove(image_file.name)
+
+
+@pytest.mark.parametrize(
+    "header, compress_type",
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", zipfile.ZIP_STORED),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", zipfile.ZIP_STORED),
+        (b"test image data", zipfile.ZIP_DEFLATED),
+    ],
+)
+def test_generate_zip_file_compression_policy(header, compress_type):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as image_file:
+        image_file.write(header + b"\x00" * 1024)
+    try:
+        image_params = [{"image": image_file.name, "image_type_id": 5}]
+
+        zip_stream = generate_zip_file(compresslevel=1, **_zip_kwargs(image_params))
+
+        zf = zipfile.ZipFile(io.BytesIO(zip_stream))
+        assert zf.getinfo("info.json").compress_type == zipfile.ZIP_DEFLATED
+        image_info = zf.getinfo(os.path.basename(image_file.name))
+        assert image_info.compress_type == compress_type
+        assert zf.testzip() is None
+    finally:
+        os.remove(image_file.name)
+
+
+@pytest.mark.parametrize(
+    "make_image",
+    [bytes, bytearray, memoryview, io.BytesIO],
+)
+def test_generate_zip_file_in_memory_images(make_image):
+    data = b"\xff\xd8\xff\xe0" + os.urandom(100 * 1024)
+    image_params = [
+        {"image": make_image(data), "image_type_id": 0, "file_name": "selfie.jpg"}
+    ]
+    validate_images(image_params)
+
+    zip_stream = generate_zip_file(**_zip_kwargs(image_params))
+
+    zf = zipfile.ZipFile(io.BytesIO(zip_stream))
+    assert zf.read("selfie.jpg") == data
+    assert zf.getinfo("selfie.jpg").compress_type == zipfile.ZIP_STORED
+    assert prepare_image_payload(image_params) == [
+        {"image_type_id": 0, "image": "", "file_name": "selfie.jpg"}
+    ]
+
+
+def test_iter_zip_file_in_memory_image():
+    data = os.urandom(100 * 1024)
+    image_params = [
+        {"image": memoryview(data), "image_type_id": 0, "file_name": "selfie.png"}
+    ]
+
+    chunks = list(iter_zip_file(chunk_size=16 * 1024, **_zip_kwargs(image_params)))
+
+    zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert zf.read("selfie.png") == data
+
+
+@pytest.mark.parametrize("file_name", [None, "selfie", "selfie.gif"])
+def test_validate_images__in_memory_image_needs_file_name(file_name):
+    image_params = [{"image": b"data", "image_type_id": 0, "file_name": file_name}]
+
+    with pytest.raises(ValueError):
+        validate_images(image_params)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_generate_zip_file_parallel_matches_serial(temp_image_file, executor_class):
+    image_params = [
+        {"image": temp_image_file, "image_type_id": 0},
+        {
+            "image": b"\xff\xd8\xff" + os.urandom(64 * 1024),
+            "image_type_id": 1,
+            "file_name": "id_front.jpg",
+        },
+        {"image": b"liveness" * 8192, "image_type_id": 6, "file_name": "frame.png"},
+    ]
+
+    serial_zip = generate_zip_file(**_zip_kwargs(image_params))
+    with executor_class(max_workers=2) as executor:
+        parallel_zip = generate_zip_file(executor=executor, **_zip_kwargs(image_params))
+
+    serial = zipfile.ZipFile(io.BytesIO(serial_zip))
+    parallel = zipfile.ZipFile(io.BytesIO(parallel_zip))
+
+    assert parallel.testzip() is None
+    assert parallel.namelist() == serial.namelist()
+    for serial_info, parallel_info in zip(serial.infolist(), parallel.infolist()):
+        assert parallel_info.compress_type == serial_info.compress_type
+        assert parallel_info.CRC == serial_info.CRC
+        assert parallel.read(parallel_info) == serial.read(serial_info)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+@pytest.mark.parametrize(
+    "build_zip",
+    [
+        generate_zip_file,
+        lambda **kwargs: b"".join(iter_zip_file(**kwargs)),
+    ],
+    ids=["seekable", "streamed"],
+)
+def test_parallel_zip_file_round_trips(executor_class, build_zip):
+    stored = b"\xff\xd8\xff" + os.urandom(64 * 1024)
+    deflated = b"liveness" * 8192
+    image_params = [
+        {"image": stored, "image_type_id": 1, "file_name": "id_front.jpg"},
+        {"image": deflated, "image_type_id": 6, "file_name": "frame.png"},
+    ]
+
+    with executor_class(max_workers=2) as executor:
+        zip_bytes = build_zip(executor=executor, **_zip_kwargs(image_params))
+
+    zf = zipfile.ZipFile(io.BytesIO(zip_bytes))
+    assert zf.testzip() is None
+    assert zf.getinfo("id_front.jpg").compress_type == zipfile.ZIP_STORED
+    assert zf.getinfo("frame.png").compress_type == zipfile.ZIP_DEFLATED
+    assert zf.read("id_front.jpg") == stored
+    assert zf.read("frame.png") == deflated
+
+
+def test_pending_zip_file_matches_generate_zip_file(temp_image_file):
+    image_params = [
+        {"image": temp_image_file, "image_type_id": 0},
+        {"image": b"liveness" * 8192, "image_type_id": 6, "file_name": "frame.png"},
+    ]
+    kwargs = _zip_kwargs(image_params)
+
+    pending_zip = PendingZipFile(kwargs.pop("image_params"))
+    pipelined = zipfile.ZipFile(io.BytesIO(pending_zip.finish(**kwargs)))
+    serial = zipfile.ZipFile(io.BytesIO(generate_zip_file(**_zip_kwargs(image_params))))
+
+    assert pipelined.testzip() is None
+    assert pipelined.namelist() == [
+        os.path.basename(temp_image_file),
+        "frame.png",
+        "info.json",
+    ]
+    for name in serial.namelist():
+        assert pipelined.read(name) == serial.read(name)
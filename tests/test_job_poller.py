@@ -0,0 +1,74 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from smile_id_core import JobPoller
+
+
+@pytest.fixture()
+def fake_utilities(json_response):
+    def build(statuses):
+        utilities = MagicMock()
+        utilities._get_sec_key.return_value = {"sec_key": "key", "timestamp": 1}
+        utilities.get_job_status.side_effect = [
+            json_response({"job_complete": s}) for s in statuses
+        ]
+        return utilities
+
+    return build
+
+
+def test_resolves_with_final_status(fake_utilities):
+    utilities = fake_utilities([False, False, True])
+    with JobPoller(interval=lambda counter: 0.01) as poller:
+        future = poller.register(utilities, {"user_id": "u", "job_id": "j"})
+        job_status = future.result(timeout=5)
+
+    assert job_status.json()["job_complete"] is True
+    assert utilities.get_job_status.call_count == 3
+
+
+def test_resolves_with_last_status_at_deadline(json_response):
+    utilities = MagicMock()
+    utilities.get_job_status.return_value = json_response({"job_complete": False})
+    with JobPoller(interval=lambda counter: 0.01) as poller:
+        future = poller.register(utilities, {}, timeout=0.1, sec_key="key", timestamp=1)
+        job_status = future.result(timeout=5)
+
+    assert job_status.json()["job_complete"] is False
+    utilities._get_sec_key.assert_not_called()
+
+
+def test_many_jobs_share_one_scheduler(fake_utilities):
+    done = threading.Event()
+    results = []
+
+    def callback(future):
+        results.append(future.result())
+        if len(results) == 50:
+            done.set()
+
+    with JobPoller(interval=lambda counter: 0.01) as poller:
+        for _ in range(50):
+            poller.register(fake_utilities([False, True]), {}, callback=callback)
+        assert done.wait(5)
+
+    assert all(result.json()["job_complete"] for result in results)
+
+
+def test_errors_are_set_on_the_future():
+    utilities = MagicMock()
+    utilities.get_job_status.side_effect = ValueError("boom")
+    with JobPoller(interval=lambda counter: 0.01) as poller:
+        future = poller.register(utilities, {}, sec_key="key", timestamp=1)
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+
+
+def test_shutdown_cancels_pending_jobs(fake_utilities):
+    poller = JobPoller(interval=lambda counter: 60)
+    future = poller.register(fake_utilities([True]), {})
+    poller.shutdown()
+
+    assert future.cancelled()
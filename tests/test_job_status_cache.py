@@ -0,0 +1,102 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+
+from smile_id_core import AsyncUtilities, JobStatusCache, Utilities
+from smile_id_core.AsyncTransport import AsyncResponse
+
+OPTIONS = {"return_job_status": True, "return_history": False, "return_images": False}
+
+
+def test_completed_job_status_is_cached(
+    api_key, partner_params, job_status_body, json_response
+):
+    cache = JobStatusCache()
+    utilities = Utilities("001", api_key, 0, job_status_cache=cache)
+    with patch("requests.Session.post") as mocked_post:
+        mocked_post.side_effect = lambda *args, **kwargs: json_response(
+            job_status_body()
+        )
+
+        first = utilities.get_job_status(partner_params, OPTIONS, None, None)
+        second = utilities.get_job_status(partner_params, OPTIONS, None, None)
+        with_history = utilities.get_job_status(
+            partner_params, dict(OPTIONS, return_history=True), None, None
+        )
+
+    assert second is first
+    assert with_history is not first
+    assert mocked_post.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 2
+
+
+def test_incomplete_job_status_is_not_cached(
+    api_key, partner_params, job_status_body, json_response
+):
+    cache = JobStatusCache()
+    utilities = Utilities("001", api_key, 0, job_status_cache=cache)
+    with patch("requests.Session.post") as mocked_post:
+        mocked_post.side_effect = lambda *args, **kwargs: json_response(
+            job_status_body(job_complete=False)
+        )
+
+        utilities.get_job_status(partner_params, OPTIONS, None, None)
+        utilities.get_job_status(partner_params, OPTIONS, None, None)
+
+    assert mocked_post.call_count == 2
+    assert len(cache) == 0
+
+
+def test_lru_eviction(json_response):
+    cache = JobStatusCache(maxsize=2)
+    responses = [json_response({"job_complete": True}) for _ in range(3)]
+    cache.put("a", responses[0])
+    cache.put("b", responses[1])
+    assert cache.get("a") is responses[0]
+    cache.put("c", responses[2])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is responses[0]
+    assert cache.get("c") is responses[2]
+
+
+def test_ttl_eviction(json_response):
+    cache = JobStatusCache(ttl=60)
+    response = json_response({"job_complete": True})
+    with patch("time.monotonic", return_value=1000):
+        cache.put("a", response)
+    with patch("time.monotonic", return_value=1059):
+        assert cache.get("a") is response
+    with patch("time.monotonic", return_value=1060):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+    cache.clear()
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_async_get_job_status_uses_cache(api_key, partner_params, job_status_body):
+    class Transport:
+        calls = 0
+
+        async def post(self, url, data=None, headers=None):
+            Transport.calls += 1
+            body = json.dumps(job_status_body()).encode("utf-8")
+            return AsyncResponse(200, "OK", {}, body)
+
+    cache = JobStatusCache()
+    utilities = AsyncUtilities(
+        "001", api_key, 0, transport=Transport(), job_status_cache=cache
+    )
+
+    async def run():
+        first = await utilities.get_job_status(partner_params, OPTIONS, None, None)
+        second = await utilities.get_job_status(partner_params, OPTIONS, None, None)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert second is first
+    assert Transport.calls == 1
+    assert cache.hits == 1
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from smile_id_core import Utilities
+from smile_id_core.AsyncTransport import AsyncResponse
+from smile_id_core.json_codec import (
+    JsonCodec,
+    OrjsonCodec,
+    dumps,
+    get_default_codec,
+    response_json,
+    set_default_codec,
+)
+
+
+class CountingCodec(JsonCodec):
+    def __init__(self):
+        self.loads_calls = 0
+        self.dumps_calls = 0
+
+    def dumps(self, obj):
+        self.dumps_calls += 1
+        return super().dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        self.loads_calls += 1
+        return super().loads(data)
+
+
+@pytest.fixture()
+def codec():
+    previous = get_default_codec()
+    codec = CountingCodec()
+    set_default_codec(codec)
+    yield codec
+    set_default_codec(previous)
+
+
+def make_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+def test_response_json_parses_once(codec):
+    response = make_response(b'{"job_complete": true}')
+
+    parsed = response_json(response)
+
+    assert parsed == {"job_complete": True}
+    assert response_json(response) is parsed
+    assert response.json() is parsed
+    assert codec.loads_calls == 1
+
+
+def test_response_json_async_response(codec):
+    response = AsyncResponse(200, "OK", {}, b'{"ResultCode": "1012"}')
+
+    assert response_json(response) == {"ResultCode": "1012"}
+    assert response.json() is response_json(response)
+    assert codec.loads_calls == 1
+
+
+def test_execute_post_uses_default_codec(codec):
+    with patch("requests.Session.post") as mocked_post:
+        Utilities.execute_post("https://example.com/job_status", {"job_id": "1"})
+
+    assert codec.dumps_calls == 1
+    assert mocked_post.call_args.kwargs["data"] == b'{"job_id": "1"}'
+
+
+def test_default_codec_is_stdlib_json():
+    assert dumps({"a": 1}) == '{"a": 1}'
+
+
+def test_orjson_codec():
+    pytest.importorskip("orjson")
+    codec = OrjsonCodec()
+
+    data = codec.dumps({"partner_params": {"job_type": 1}})
+
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == {"partner_params": {"job_type": 1}}
@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import smile_id_core
+
+PROBE = """
+import json, sys
+{statement}
+print(json.dumps([m for m in ("requests", "Crypto", "aiohttp", "concurrent.futures") if m in sys.modules]))
+"""
+
+
+def loaded_modules(statement):
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(statement=statement)]
+    )
+    return json.loads(output)
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        ("import smile_id_core", []),
+        ("from smile_id_core import Signature", []),
+        ("from smile_id_core import IdApi", []),
+        ("from smile_id_core import WebApi; WebApi", []),
+        ("from smile_id_core import IdApi; IdApi('001', 'key', 0)", ["requests"]),
+        ("from smile_id_core import AsyncIdApi", ["aiohttp", "concurrent.futures"]),
+    ],
+)
+def test_heavy_dependencies_are_imported_on_first_use(statement, expected):
+    assert loaded_modules(statement) == expected
+
+
+def test_public_names_resolve_to_classes():
+    from smile_id_core.Utilities import Utilities
+
+    assert smile_id_core.Utilities is Utilities
+    assert set(smile_id_core.__all__) <= set(dir(smile_id_core))
+    for name in smile_id_core.__all__:
+        assert isinstance(getattr(smile_id_core, name), type)
+    with pytest.raises(AttributeError):
+        smile_id_core.NotAClass
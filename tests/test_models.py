@@ -0,0 +1,128 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from smile_id_core import IdApi, WebApi
+from smile_id_core.models import (
+    IdInfo,
+    Job,
+    JobImage,
+    Options,
+    PartnerParams,
+    images_payload,
+)
+
+
+def test_models_are_validated_on_construction():
+    with pytest.raises(ValueError, match="user_id is a string"):
+        PartnerParams(1, "job", 1)
+    with pytest.raises(ValueError, match="country cannot be empty"):
+        IdInfo(id_type="PASSPORT", id_number="A00000000", entered=True)
+    with pytest.raises(ValueError, match="return_images needs to be a boolean"):
+        Options(return_images="yes")
+    with pytest.raises(ValueError, match="file_name"):
+        JobImage(b"selfie", 0)
+    with pytest.raises(ValueError, match="image details"):
+        Job({"user_id": "user", "job_id": "job", "job_type": 1})
+
+
+def test_models_have_no_instance_dict():
+    partner_params = PartnerParams("user", "job", 1, custom="value")
+
+    assert not hasattr(partner_params, "__dict__")
+    assert partner_params.custom == "value"
+    assert partner_params.to_dict() == {
+        "user_id": "user",
+        "job_id": "job",
+        "job_type": 1,
+        "custom": "value",
+    }
+
+
+def test_to_dict_returns_a_copy():
+    options = Options()
+    payload = options.to_dict()
+    payload["return_history"] = True
+
+    assert options.return_history is False
+    assert options.to_dict() is not options.to_dict()
+
+
+def test_job_builds_models_from_dicts():
+    job = Job(
+        {"user_id": "user", "job_id": "job", "job_type": 1},
+        [{"image": "base64image", "image_type_id": 2}],
+        options={"return_job_status": False},
+    )
+
+    assert job.partner_params == PartnerParams("user", "job", 1)
+    assert job.images == (JobImage("base64image", 2),)
+    assert job.options.return_job_status is False
+    assert job.id_info is None
+
+
+def test_images_payload_accepts_mixed_lists():
+    images = [JobImage("base64image", 2), {"image": "other", "image_type_id": 3}]
+
+    assert images_payload(images) == [
+        {"image": "base64image", "image_type_id": 2},
+        {"image": "other", "image_type_id": 3},
+    ]
+    with pytest.raises(ValueError):
+        images_payload([])
+
+
+def test_web_api_submit_jobs_accepts_jobs(api_key):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+    jobs = [
+        Job(
+            PartnerParams("user", "job-{}".format(i), 1),
+            [JobImage(b"selfie", 0, "selfie.jpg")],
+            options=Options(return_job_status=False),
+        )
+        for i in range(3)
+    ]
+    prep_upload = MagicMock(status_code=200)
+    prep_upload.json.return_value = {
+        "upload_url": "https://upload.example.com",
+        "smile_job_id": "0000000857",
+    }
+
+    with patch("requests.Session.post", return_value=prep_upload) as mocked_post, patch(
+        "requests.Session.put"
+    ) as mocked_put, patch(
+        "smile_id_core.Utilities.Utilities.validate_partner_params"
+    ) as validate_partner_params:
+        mocked_put.return_value.status_code = 200
+        results = list(web_api.submit_jobs(jobs, preserve_order=True))
+
+    assert [r.result for r in results] == [
+        {"success": True, "smile_job_id": "0000000857"}
+    ] * 3
+    validate_partner_params.assert_not_called()
+    sent = [
+        json.loads(c.kwargs["data"])["partner_params"]
+        for c in mocked_post.call_args_list
+    ]
+    assert sorted(p["job_id"] for p in sent) == ["job-0", "job-1", "job-2"]
+
+
+def test_id_api_submit_job_accepts_models(api_key):
+    id_api = IdApi("001", api_key, 0)
+    partner_params = PartnerParams("user", "job", 5)
+    id_info = IdInfo(
+        first_name="FirstName",
+        country="NG",
+        id_type="PASSPORT",
+        id_number="A00000000",
+        entered=True,
+    )
+
+    with patch("requests.Session.post") as mocked_post:
+        mocked_post.return_value.status_code = 200
+        id_api.submit_job(partner_params, id_info, use_validation_api=False)
+
+    payload = json.loads(mocked_post.call_args.kwargs["data"])
+    assert payload["partner_params"] == partner_params.to_dict()
+    assert payload["id_number"] == "A00000000"
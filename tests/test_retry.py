@@ -0,0 +1,201 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from aiohttp import web
+
+from smile_id_core.AsyncTransport import AsyncTransport
+from smile_id_core.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    phase_for,
+)
+from smile_id_core.ServerError import ServerError
+from smile_id_core.Transport import Transport
+
+API_URL = "https://api.example.com/test"
+
+
+def response(status_code):
+    return MagicMock(status_code=status_code)
+
+
+@pytest.mark.parametrize(
+    "method, url, phase",
+    [
+        ("POST", API_URL + "/upload", "prep_upload"),
+        ("PUT", "https://s3.example.com/bucket/upload", "upload"),
+        ("POST", API_URL + "/job_status", "job_status"),
+        ("POST", API_URL + "/id_verification", "id_verification"),
+        ("GET", API_URL + "/services", "services"),
+    ],
+)
+def test_phase_for(method, url, phase):
+    assert phase_for(method, url) == phase
+
+
+def test_retry_delay_backs_off_with_jitter():
+    policy = RetryPolicy(max_attempts=4, backoff=1, max_backoff=3, jitter=False)
+    assert [policy.retry_delay(attempt) for attempt in (1, 2, 3, 4)] == [
+        1,
+        2,
+        3,
+        None,
+    ]
+
+    policy = RetryPolicy(max_attempts=10, backoff=1, max_backoff=3)
+    for attempt in range(1, 10):
+        assert 0 <= policy.retry_delay(attempt) <= min(3, 2 ** (attempt - 1))
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=2)
+    policy = RetryPolicy(max_attempts=10, budget=budget)
+
+    assert policy.retry_delay(1) is not None
+    assert policy.retry_delay(1) is None
+    policy.record_request()
+    policy.record_request()
+    assert policy.retry_delay(1) is not None
+    assert policy.retry_delay(1) is None
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    with patch("time.monotonic", return_value=100):
+        breaker.before_request("job_status")
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("job_status")
+    with patch("time.monotonic", return_value=130):
+        breaker.before_request("job_status")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("job_status")
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_replaces_an_abandoned_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    with patch("time.monotonic", return_value=100):
+        breaker.record_failure()
+    with patch("time.monotonic", return_value=130):
+        # the trial request is cancelled and never records its outcome
+        breaker.before_request("job_status")
+    with patch("time.monotonic", return_value=159):
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("job_status")
+    with patch("time.monotonic", return_value=160):
+        breaker.before_request("job_status")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_transport_retries_retryable_status():
+    transport = Transport(retry_policy=RetryPolicy(max_attempts=3))
+    with patch("requests.Session.post") as mocked_post, patch(
+        "time.sleep"
+    ) as mocked_sleep:
+        mocked_post.side_effect = [response(503), response(502), response(200)]
+        result = transport.post(API_URL + "/job_status", data="{}")
+
+    assert result.status_code == 200
+    assert mocked_post.call_count == 3
+    assert mocked_sleep.call_count == 2
+
+
+def test_transport_returns_last_response_when_retries_run_out():
+    transport = Transport(retry_policy=RetryPolicy(max_attempts=2))
+    with patch("requests.Session.post") as mocked_post, patch("time.sleep"):
+        mocked_post.side_effect = [response(503), response(503), response(200)]
+        result = transport.post(API_URL + "/job_status", data="{}")
+
+    assert result.status_code == 503
+    assert mocked_post.call_count == 2
+
+
+def test_transport_retries_connection_errors_per_phase():
+    transport = Transport(retry_policies={"upload": RetryPolicy(max_attempts=2)})
+    with patch("requests.Session.put") as mocked_put, patch(
+        "requests.Session.post"
+    ) as mocked_post, patch("time.sleep"):
+        mocked_put.side_effect = [requests.ConnectionError(), response(200)]
+        mocked_post.side_effect = requests.ConnectionError()
+
+        assert transport.put("https://s3.example.com/zip", data=b"zip").ok
+        with pytest.raises(requests.ConnectionError):
+            transport.post(API_URL + "/id_verification", data="{}")
+
+    assert mocked_put.call_count == 2
+    assert mocked_post.call_count == 1
+
+
+def test_default_policy_does_not_retry_non_idempotent_posts():
+    transport = Transport(retry_policy=RetryPolicy(max_attempts=3))
+    with patch("requests.Session.post") as mocked_post, patch("time.sleep"):
+        mocked_post.side_effect = requests.ReadTimeout()
+        for endpoint in ("/upload", "/id_verification"):
+            with pytest.raises(requests.ReadTimeout):
+                transport.post(API_URL + endpoint, data="{}")
+        assert mocked_post.call_count == 2
+
+        mocked_post.side_effect = [requests.ReadTimeout(), response(200)]
+        assert transport.post(API_URL + "/job_status", data="{}").ok
+        assert mocked_post.call_count == 4
+
+
+def test_transport_does_not_replay_streamed_body():
+    transport = Transport(retry_policy=RetryPolicy(max_attempts=3))
+    with patch("requests.Session.put") as mocked_put, patch("time.sleep"):
+        mocked_put.return_value = response(503)
+        result = transport.put("https://s3.example.com/zip", data=iter([b"zip"]))
+
+    assert result.status_code == 503
+    assert mocked_put.call_count == 1
+
+
+def test_transport_circuit_breaker_fails_fast():
+    transport = Transport(
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    )
+    with patch("requests.Session.post") as mocked_post:
+        mocked_post.return_value = response(500)
+        transport.post(API_URL + "/job_status", data="{}")
+        transport.post(API_URL + "/job_status", data="{}")
+        with pytest.raises(ServerError):
+            transport.post(API_URL + "/job_status", data="{}")
+        mocked_post.return_value = response(200)
+        assert transport.post(API_URL + "/upload", data="{}").status_code == 200
+
+    assert mocked_post.call_count == 3
+
+
+def test_async_transport_retries():
+    statuses = iter([503, 200])
+
+    async def handle(request):
+        return web.json_response({}, status=next(statuses))
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/job_status", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        url = "http://127.0.0.1:{}/job_status".format(runner.addresses[0][1])
+        try:
+            async with AsyncTransport(
+                retry_policy=RetryPolicy(max_attempts=2, backoff=0)
+            ) as transport:
+                return await transport.post(url, data="{}")
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()).status_code == 200
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from smile_id_core import Utilities, WebApi
+from smile_id_core.ServicesCache import (
+    ServicesCache,
+    ServicesIndex,
+    read_services_snapshot,
+    write_services_snapshot,
+)
+
+SERVICES = {
+    "id_types": {
+        "NG": {
+            "BVN": ["country", "id_type", "id_number", "user_id", "job_id"],
+            "PASSPORT": ["country", "id_type", "id_number", "first_name", "dob"],
+        }
+    }
+}
+
+
+@pytest.fixture()
+def id_info_params():
+    return {
+        "first_name": "FirstName",
+        "country": "NG",
+        "id_type": "PASSPORT",
+        "id_number": "A00000000",
+        "dob": "1989-09-20",
+        "entered": True,
+    }
+
+
+def test_index_validation(id_info_params):
+    index = ServicesIndex(SERVICES)
+    assert index.required_keys[("NG", "BVN")] == (
+        "country",
+        "id_type",
+        "id_number",
+        "user_id",
+        "job_id",
+    )
+    index.validate(id_info_params, {"user_id": "u", "job_id": "j"})
+
+    with pytest.raises(ValueError, match="country ZW is invalid"):
+        index.validate(dict(id_info_params, country="ZW"), {})
+    with pytest.raises(ValueError, match="id_type NIN is invalid"):
+        index.validate(dict(id_info_params, id_type="NIN"), {})
+    with pytest.raises(ValueError, match="key dob cannot be empty"):
+        index.validate(dict(id_info_params, dob=""), {})
+    with pytest.raises(ValueError, match="key user_id is required"):
+        index.validate(dict(id_info_params, id_type="BVN"), {"job_id": "j"})
+
+
+def test_fresh_entry_is_served_from_memory():
+    cache = ServicesCache(ttl=60)
+    calls = []
+    loader = lambda: calls.append(1) or SERVICES
+
+    first = cache.get_index(0, loader)
+    second = cache.get_index(0, loader)
+
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = ServicesCache(ttl=0, stale_ttl=60)
+    cache.put(0, {"id_types": {}})
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return SERVICES
+
+    stale = cache.get_index(0, loader)
+
+    assert stale.countries == frozenset()
+    assert refreshed.wait(5)
+
+
+def test_expired_entry_is_reloaded():
+    cache = ServicesCache(ttl=0, stale_ttl=0)
+    cache.put(0, {"id_types": {}})
+
+    index = cache.get_index(0, lambda: SERVICES)
+
+    assert index.countries == frozenset(["NG"])
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ServicesCache()
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        return SERVICES
+
+    indexes = []
+    threads = [
+        threading.Thread(target=lambda: indexes.append(cache.get_index("k", loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(indexes) == 8
+    assert all(index is indexes[0] for index in indexes)
+
+
+def test_failed_load_is_retried():
+    cache = ServicesCache()
+
+    def failing():
+        raise OSError("down")
+
+    with pytest.raises(OSError):
+        cache.get_index("k", failing)
+    assert cache.get_index("k", lambda: SERVICES).countries == {"NG"}
+
+
+def test_concurrent_async_misses_share_one_load():
+    cache = ServicesCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return SERVICES
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.get_index_async("k", loader) for _ in range(50)]
+        )
+
+    indexes = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(index is indexes[0] for index in indexes)
+
+
+def test_validate_id_params_fetches_services_once(id_info_params):
+    cache = ServicesCache()
+    with patch("requests.Session.get") as mocked_get:
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.json.return_value = SERVICES
+        for _ in range(3):
+            Utilities.validate_id_params(
+                "https://example.com", id_info_params, {}, services_cache=cache
+            )
+    assert mocked_get.call_count == 1
+
+
+def test_export_and_load_snapshot(tmp_path, id_info_params):
+    path = str(tmp_path / "services.json")
+    with patch("requests.Session.get") as mocked_get:
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.json.return_value = SERVICES
+        Utilities.export_services_snapshot(0, path)
+
+    key, services, fetched_at = read_services_snapshot(path)
+    assert key == "https://3eydmgh10d.execute-api.us-west-2.amazonaws.com/test"
+    assert services == SERVICES
+    assert fetched_at <= time.time()
+
+    cache = ServicesCache()
+    assert cache.load_snapshot(path) == key
+    index = cache.get_index(key, lambda: pytest.fail("should not fetch"))
+    index.validate(id_info_params, {})
+
+
+def test_old_snapshot_is_served_while_the_endpoint_is_down(tmp_path):
+    path = str(tmp_path / "services.json")
+    write_services_snapshot(path, "url", SERVICES, fetched_at=time.time() - 10 ** 6)
+    cache = ServicesCache(ttl=60, stale_ttl=60)
+    cache.load_snapshot(path)
+    attempted = threading.Event()
+
+    def loader():
+        attempted.set()
+        raise ConnectionError("services are down")
+
+    assert cache.get_index("url", loader).countries == frozenset(["NG"])
+    assert attempted.wait(5)
+
+
+def test_refresh_rewrites_the_snapshot(tmp_path):
+    path = str(tmp_path / "services.json")
+    write_services_snapshot(path, "url", {"id_types": {}}, fetched_at=0)
+    cache = ServicesCache(ttl=60)
+    cache.load_snapshot(path)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return SERVICES
+
+    assert cache.get_index("url", loader).countries == frozenset()
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if read_services_snapshot(path)[1] == SERVICES:
+            break
+        time.sleep(0.01)
+    assert read_services_snapshot(path)[1] == SERVICES
+    assert cache.get_index("url", loader).countries == frozenset(["NG"])
+
+
+def test_missing_snapshot_is_written_after_the_first_fetch(tmp_path):
+    path = str(tmp_path / "services.json")
+    cache = ServicesCache()
+    with pytest.raises(FileNotFoundError):
+        cache.load_snapshot(path)
+
+    cache.load_snapshot(path, "url")
+    cache.get_index("url", lambda: SERVICES)
+
+    assert read_services_snapshot(path)[:2] == ("url", SERVICES)
+
+
+def test_invalid_snapshots_are_rejected(tmp_path):
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps({"version": 99}))
+    with pytest.raises(ValueError, match="version 99"):
+        ServicesCache().load_snapshot(str(path))
+
+    path.write_text("[]")
+    with pytest.raises(ValueError, match="not a services snapshot"):
+        ServicesCache().load_snapshot(str(path))
+
+    write_services_snapshot(str(path), "url", SERVICES)
+    with pytest.raises(ValueError, match="is for url"):
+        ServicesCache().load_snapshot(str(path), "other")
+
+
+def test_client_loads_snapshot_at_construction(tmp_path, id_info_params):
+    path = str(tmp_path / "services.json")
+    write_services_snapshot(path, "https://example.com", SERVICES)
+    cache = ServicesCache()
+    api_key = RSA.generate(2048).publickey().export_key()
+
+    with patch(
+        "smile_id_core.WebApi.get_default_services_cache", return_value=cache
+    ), patch(
+        "smile_id_core.Utilities.get_default_services_cache", return_value=cache
+    ), patch(
+        "requests.Session.get"
+    ) as mocked_get:
+        web_api = WebApi(
+            "001", "", api_key, "https://example.com", services_snapshot=path
+        )
+        report = web_api.validate_jobs(
+            [
+                (
+                    {"user_id": "u", "job_id": "j", "job_type": 5},
+                    None,
+                    id_info_params,
+                    None,
+                )
+            ]
+        )
+
+    mocked_get.assert_not_called()
+    assert report.ok
@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import json
+from unittest.mock import MagicMock, patch
+
+
+from smile_id_core import AsyncIdApi, IdApi, Utilities, WebApi
+from smile_id_core.AsyncTransport import AsyncResponse
+from smile_id_core.tracing import NOOP_TRACER, OpenTelemetryTracer, Tracer
+
+
+class RecordingSpan:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        span = RecordingSpan(name, attributes)
+        self.spans.append(span)
+        yield span
+
+    def names(self):
+        return [span.name for span in self.spans]
+
+    def get(self, name):
+        return next(span for span in self.spans if span.name == name)
+
+
+def id_info_params():
+    return {
+        "first_name": "FirstName",
+        "last_name": "LastName",
+        "country": "NG",
+        "id_type": "PASSPORT",
+        "id_number": "A00000000",
+        "dob": "1989-09-20",
+        "entered": True,
+    }
+
+
+def test_default_tracer_is_noop(api_key):
+    assert WebApi("001", "https://a_callback.com", api_key, 0).tracer is NOOP_TRACER
+    with NOOP_TRACER.span("smile_id.test", a=1) as span:
+        span.set_attribute("b", 2)
+
+
+def test_web_api_submit_job_spans(
+    api_key, job_status_body, json_response, partner_params
+):
+    tracer = RecordingTracer()
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0, tracer=tracer)
+    prep_upload = json_response(
+        {"upload_url": "https://upload.example.com", "smile_job_id": "0000000001"}
+    )
+    with patch("requests.Session.post") as mocked_post, patch(
+        "requests.Session.put"
+    ) as mocked_put:
+        mocked_post.side_effect = [prep_upload, json_response(job_status_body())]
+        mocked_put.return_value.status_code = 200
+        mocked_put.return_value.ok = True
+        web_api.submit_job(
+            partner_params,
+            [{"image_type_id": "2", "image": "base6image"}],
+            id_info_params(),
+            {
+                "return_job_status": True,
+                "return_history": False,
+                "return_images": False,
+            },
+            False,
+        )
+
+    assert tracer.names() == [
+        "smile_id.submit_job",
+        "smile_id.validate",
+        "smile_id.validate_id_params",
+        "smile_id.sign",
+        "smile_id.prep_upload",
+        "smile_id.zip",
+        "smile_id.upload",
+        "smile_id.poll_job_status",
+        "smile_id.get_job_status",
+        "smile_id.job_status",
+    ]
+    assert tracer.get("smile_id.submit_job").attributes["partner_id"] == "001"
+    assert tracer.get("smile_id.validate").attributes["job_type"] == 1
+    assert tracer.get("smile_id.prep_upload").attributes["http.status_code"] == 200
+    zip_bytes = tracer.get("smile_id.zip").attributes["zip.bytes"]
+    assert zip_bytes > 0
+    assert tracer.get("smile_id.upload").attributes["upload.bytes"] == zip_bytes
+    assert tracer.get("smile_id.job_status").attributes["http.status_code"] == 200
+
+
+def test_web_api_stream_upload_counts_bytes(api_key, json_response, partner_params):
+    tracer = RecordingTracer()
+    web_api = WebApi(
+        "001",
+        "https://a_callback.com",
+        api_key,
+        0,
+        stream_uploads=True,
+        tracer=tracer,
+    )
+    prep_upload = json_response(
+        {"upload_url": "https://upload.example.com", "smile_job_id": "0000000001"}
+    )
+
+    def consume(url, data=None, **kwargs):
+        body = b"".join(data)
+        assert body.startswith(b"PK")
+        return json_response({}, 200)
+
+    with patch("requests.Session.post") as mocked_post, patch(
+        "requests.Session.put", side_effect=consume
+    ):
+        mocked_post.return_value = prep_upload
+        web_api.submit_job(
+            partner_params,
+            [{"image_type_id": "2", "image": "base6image"}],
+            id_info_params(),
+            {
+                "return_job_status": False,
+                "return_history": False,
+                "return_images": False,
+            },
+            False,
+        )
+
+    assert "smile_id.zip" not in tracer.names()
+    assert tracer.get("smile_id.upload").attributes["upload.bytes"] > 0
+
+
+def test_id_api_submit_job_spans(api_key, json_response, partner_params):
+    tracer = RecordingTracer()
+    id_api = IdApi("001", api_key, 0, tracer=tracer)
+    with patch("requests.Session.post") as mocked_post:
+        mocked_post.return_value = json_response({"ResultCode": "1012"})
+        id_api.submit_job(dict(partner_params, job_type=5), id_info_params(), False)
+
+    assert tracer.names() == [
+        "smile_id.id_api.submit_job",
+        "smile_id.validate_id_params",
+        "smile_id.sign",
+        "smile_id.id_verification",
+    ]
+    assert tracer.get("smile_id.id_verification").attributes["http.status_code"] == 200
+
+
+def test_utilities_shares_tracer_with_sub_clients(api_key):
+    tracer = RecordingTracer()
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0, tracer=tracer)
+    assert web_api._get_utilities().tracer is tracer
+    assert web_api._get_id_api().tracer is tracer
+    assert Utilities("001", api_key, 0).tracer is NOOP_TRACER
+
+
+def test_async_id_api_submit_job_spans(api_key, partner_params):
+    class Transport:
+        async def post(self, url, data=None, headers=None):
+            body = json.dumps({"ResultCode": "1012"}).encode("utf-8")
+            return AsyncResponse(200, "OK", {}, body)
+
+    tracer = RecordingTracer()
+    id_api = AsyncIdApi("001", api_key, 0, transport=Transport(), tracer=tracer)
+    asyncio.run(
+        id_api.submit_job(dict(partner_params, job_type=5), id_info_params(), False)
+    )
+
+    assert tracer.names()[0] == "smile_id.id_api.submit_job"
+    assert tracer.get("smile_id.id_verification").attributes["http.status_code"] == 200
+
+
+def test_open_telemetry_tracer_drops_none_attributes():
+    otel = MagicMock()
+    tracer = OpenTelemetryTracer(otel)
+    with tracer.span("smile_id.validate", job_type=1, partner_id=None):
+        pass
+    otel.start_as_current_span.assert_called_once_with(
+        "smile_id.validate", attributes={"job_type": 1}
+    )
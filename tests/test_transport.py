@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from smile_id_core.Transport import (
+    Transport,
+    get_default_transport,
+    set_default_transport,
+)
+from smile_id_core import IdApi, Utilities, WebApi
+
+
+def test_api_and_upload_use_separate_pools():
+    transport = Transport(pool_maxsize=4, upload_pool_maxsize=2)
+    assert transport.api_session is not transport.upload_session
+
+    api_adapter = transport.api_session.get_adapter("https://api.example.com")
+    upload_adapter = transport.upload_session.get_adapter("https://s3.example.com")
+    assert api_adapter._pool_maxsize == 4
+    assert upload_adapter._pool_maxsize == 2
+
+
+def test_put_goes_through_upload_session():
+    transport = Transport()
+    with patch.object(transport.upload_session, "put") as mocked_put, patch.object(
+        transport.api_session, "put"
+    ) as mocked_api_put:
+        transport.put("https://s3.example.com/upload", data=b"zip")
+    mocked_put.assert_called_once()
+    mocked_api_put.assert_not_called()
+
+
+def test_clients_share_default_transport():
+    transport = Transport()
+    previous = get_default_transport()
+    set_default_transport(transport)
+    try:
+        web_api = WebApi("001", "https://a_callback.com", "key", 0)
+        id_api = IdApi("001", "key", 0)
+        utilities = Utilities("001", "key", 0)
+        assert web_api.transport is transport
+        assert id_api.transport is transport
+        assert utilities.transport is transport
+    finally:
+        set_default_transport(previous)
+
+
+def test_explicit_transport_is_used():
+    transport = Transport()
+    with patch.object(transport.api_session, "get") as mocked_get:
+        Utilities.execute_get("https://api.example.com/services", transport)
+    mocked_get.assert_called_once()
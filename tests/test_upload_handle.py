@@ -0,0 +1,149 @@
+import asyncio
+import io
+import json
+import zipfile
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from smile_id_core import AsyncWebApi, ServerError, UploadError, WebApi
+from smile_id_core.AsyncTransport import AsyncResponse
+from smile_id_core.UploadHandle import UploadHandle
+
+OPTIONS = {"return_job_status": False, "return_history": False, "return_images": False}
+IMAGES = [{"image_type_id": "2", "image": "base6image"}]
+
+
+@pytest.fixture()
+def prep_upload_response(json_response):
+    return json_response(
+        {"upload_url": "https://s3.example.com/zip", "smile_job_id": "0000000001"}
+    )
+
+
+def test_failed_upload_is_resumed_without_preparing_again(
+    api_key, partner_params, json_response, prep_upload_response
+):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+    bodies = []
+
+    def put(url, data=None, **kwargs):
+        bodies.append(bytes(data))
+        return json_response({}, 503 if len(bodies) == 1 else 200)
+
+    with patch("requests.Session.post") as mocked_post, patch(
+        "requests.Session.put", side_effect=put
+    ):
+        mocked_post.return_value = prep_upload_response
+        with pytest.raises(UploadError) as exc_info:
+            web_api.submit_job(partner_params, IMAGES, None, OPTIONS, False)
+        handle = exc_info.value.handle
+        result = web_api.resume_upload(handle)
+
+    assert isinstance(exc_info.value, ServerError)
+    assert "status=503" in exc_info.value.args[0]
+    assert result == {"success": True, "smile_job_id": "0000000001"}
+    assert mocked_post.call_count == 1
+    assert handle.attempts == 2
+    assert bodies[0] == bodies[1]
+    assert handle.body is None
+
+
+def test_streamed_upload_is_spooled_for_resume(
+    api_key, partner_params, json_response, prep_upload_response
+):
+    web_api = WebApi(
+        "001",
+        "https://a_callback.com",
+        api_key,
+        0,
+        stream_uploads=True,
+        spool_stream_uploads=True,
+    )
+    bodies = []
+
+    def put(url, data=None, **kwargs):
+        if not bodies:
+            bodies.append(next(iter(data)))
+            raise requests.ConnectionError("connection reset")
+        bodies.append(data.read())
+        return json_response({})
+
+    with patch("requests.Session.post") as mocked_post, patch(
+        "requests.Session.put", side_effect=put
+    ):
+        mocked_post.return_value = prep_upload_response
+        with pytest.raises(UploadError) as exc_info:
+            web_api.submit_job(partner_params, IMAGES, None, OPTIONS, False)
+        assert isinstance(exc_info.value.__cause__, requests.ConnectionError)
+        result = web_api.resume_upload(exc_info.value.handle)
+
+    assert result["smile_job_id"] == "0000000001"
+    assert bodies[1].startswith(bodies[0])
+    assert zipfile.ZipFile(io.BytesIO(bodies[1])).namelist() == ["info.json"]
+
+
+def test_streamed_upload_is_not_spooled_by_default(
+    api_key, partner_params, prep_upload_response
+):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0, stream_uploads=True)
+
+    def put(url, data=None, **kwargs):
+        next(iter(data))
+        raise requests.ConnectionError("connection reset")
+
+    with patch("requests.Session.post") as mocked_post, patch(
+        "requests.Session.put", side_effect=put
+    ), patch("tempfile.TemporaryFile") as mocked_temporary_file:
+        mocked_post.return_value = prep_upload_response
+        with pytest.raises(UploadError) as exc_info:
+            web_api.submit_job(partner_params, IMAGES, None, OPTIONS, False)
+        with pytest.raises(ServerError):
+            web_api.resume_upload(exc_info.value.handle)
+
+    assert not mocked_temporary_file.called
+
+
+def test_incomplete_stream_cannot_be_resumed():
+    def chunks():
+        yield b"PK"
+        raise OSError("image went away")
+
+    handle = UploadHandle("https://s3.example.com/zip", "1", {}, OPTIONS)
+    stream = handle.spool(chunks())
+    assert next(stream) == b"PK"
+    with pytest.raises(OSError):
+        next(stream)
+
+    with pytest.raises(ServerError):
+        handle.rewind()
+
+
+def test_async_failed_upload_is_resumed(api_key, partner_params):
+    class Transport:
+        def __init__(self):
+            self.calls = []
+
+        async def post(self, url, data=None, headers=None):
+            self.calls.append("POST")
+            body = {"upload_url": "https://s3.example.com/zip", "smile_job_id": "1"}
+            return AsyncResponse(200, "OK", {}, json.dumps(body).encode("utf-8"))
+
+        async def put(self, url, data=None, headers=None):
+            self.calls.append("PUT")
+            if self.calls.count("PUT") == 1:
+                raise ConnectionResetError()
+            return AsyncResponse(200, "OK", {}, b"")
+
+    transport = Transport()
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, transport)
+
+    async def run():
+        try:
+            await web_api.submit_job(partner_params, IMAGES, None, OPTIONS, False)
+        except UploadError as e:
+            return await web_api.resume_upload(e.handle)
+
+    assert asyncio.run(run()) == {"success": True, "smile_job_id": "1"}
+    assert transport.calls == ["POST", "PUT", "PUT"]
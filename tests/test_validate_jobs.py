@@ -0,0 +1,163 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from smile_id_core import AsyncWebApi, WebApi
+from smile_id_core.AsyncTransport import AsyncResponse
+from smile_id_core.ServicesCache import ServicesCache
+from smile_id_core.models import Job, JobImage, PartnerParams
+
+SERVICES = {
+    "id_types": {
+        "NG": {"PASSPORT": ["country", "id_type", "id_number", "first_name", "dob"]}
+    }
+}
+OPTIONS = {"return_job_status": True, "return_history": False, "return_images": False}
+IMAGES = [{"image_type_id": "2", "image": "base6image"}]
+
+
+@pytest.fixture(autouse=True)
+def services_cache():
+    with patch(
+        "smile_id_core.Utilities.get_default_services_cache",
+        return_value=ServicesCache(),
+    ), patch(
+        "smile_id_core.AsyncUtilities.get_default_services_cache",
+        return_value=ServicesCache(),
+    ):
+        yield
+
+
+def job_partner_params(job_id, job_type=1):
+    return {"user_id": "user", "job_id": job_id, "job_type": job_type}
+
+
+def id_info(**overrides):
+    return dict(
+        {
+            "first_name": "FirstName",
+            "country": "NG",
+            "id_type": "PASSPORT",
+            "id_number": "A00000000",
+            "dob": "1989-09-20",
+            "entered": True,
+        },
+        **overrides
+    )
+
+
+def jobs():
+    return [
+        {"partner_params": job_partner_params("0"), "images_params": IMAGES},
+        {"partner_params": job_partner_params(1), "images_params": IMAGES},
+        {
+            "partner_params": job_partner_params("2"),
+            "images_params": [{"image_type_id": 0, "image": "missing.jpg"}],
+        },
+        (job_partner_params("3"), IMAGES, id_info(), OPTIONS),
+        (job_partner_params("4"), IMAGES, id_info(country="KE"), OPTIONS),
+        Job(PartnerParams("user", "5", 5), id_info=id_info()),
+        {"partner_params": job_partner_params("6", 5)},
+        {
+            "partner_params": job_partner_params("7"),
+            "images_params": [JobImage("b64", 2)],
+        },
+        {"images_params": IMAGES},
+    ]
+
+
+def test_validate_jobs_reports_failures(api_key):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+    services = MagicMock(status_code=200)
+    services.json.return_value = SERVICES
+
+    with patch("requests.Session.get", return_value=services) as mocked_get, patch(
+        "requests.Session.post"
+    ) as mocked_post, patch("requests.Session.put") as mocked_put:
+        report = web_api.validate_jobs(iter(jobs()))
+
+    assert mocked_get.call_count == 1
+    mocked_post.assert_not_called()
+    mocked_put.assert_not_called()
+    assert report.total == 9
+    assert not report.ok
+    assert report.failed_indexes == [1, 2, 4, 6, 8]
+    assert report.failures[0] == (1, "ValueError: Please ensure job_id is a string")
+    assert report.failures[1] == (
+        2,
+        "FileNotFoundError: No such file or directory missing.jpg",
+    )
+    assert report.failures[2] == (4, "ValueError: country KE is invalid")
+    assert report.failures[4] == (8, "KeyError: 'partner_params'")
+
+
+def test_validate_jobs_without_id_info_does_not_fetch_services(api_key):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+
+    with patch("requests.Session.get") as mocked_get:
+        report = web_api.validate_jobs(jobs()[:1])
+
+    mocked_get.assert_not_called()
+    assert report.ok
+
+
+def test_job_defers_use_validation_api_to_the_batch(api_key):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+    services = MagicMock(status_code=200)
+    services.json.return_value = SERVICES
+    job = Job(PartnerParams("user", "0", 5), id_info=id_info(country="KE"))
+
+    with patch("requests.Session.get", return_value=services) as mocked_get:
+        assert web_api.validate_jobs([job], use_validation_api=False).ok
+        mocked_get.assert_not_called()
+        explicit = Job(job.partner_params, id_info=job.id_info, use_validation_api=True)
+        report = web_api.validate_jobs([explicit], use_validation_api=False)
+
+    assert report.failed_indexes == [0]
+    assert mocked_get.call_count == 1
+
+
+def test_services_outage_fails_the_call_once(api_key):
+    web_api = WebApi("001", "https://a_callback.com", api_key, 0)
+
+    with patch(
+        "requests.Session.get", side_effect=requests.ConnectionError("/services")
+    ) as mocked_get:
+        with pytest.raises(requests.ConnectionError):
+            web_api.validate_jobs(jobs())
+
+    assert mocked_get.call_count == 1
+
+
+def test_async_validate_jobs(api_key):
+    class Transport:
+        def __init__(self):
+            self.calls = 0
+
+        async def get(self, url, headers=None):
+            self.calls += 1
+            return AsyncResponse(200, "OK", {}, json.dumps(SERVICES).encode("utf-8"))
+
+    transport = Transport()
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, transport)
+
+    report = asyncio.run(web_api.validate_jobs(jobs()))
+
+    assert transport.calls == 1
+    assert report.failed_indexes == [1, 2, 4, 6, 8]
+
+
+def test_async_validate_jobs_without_id_info_does_not_fetch_services(api_key):
+    class Transport:
+        async def get(self, url, headers=None):
+            raise AssertionError("/services should not be fetched")
+
+    web_api = AsyncWebApi("001", "https://a_callback.com", api_key, 0, Transport())
+
+    assert asyncio.run(web_api.validate_jobs(jobs()[:1])).ok
+    job = Job(PartnerParams("user", "5", 5), id_info=id_info())
+    report = asyncio.run(web_api.validate_jobs([job], use_validation_api=False))
+    assert report.ok